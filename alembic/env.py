@@ -3,11 +3,8 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 
 from alembic import context
-# Import your models' Base
-from app.database import \
-    Base  # ✅ make sure this points to your SQLAlchemy Base
-from app.models.category import Base
-from app.models.user import Base
+# Importing app.models registers every table on the shared Base
+from app.models import Base
 
 # this is the Alembic Config object
 config = context.config
@@ -1,32 +0,0 @@
-"""create users table
-
-Revision ID: 1d09a4ad0998
-Revises: ddeda4036af2
-Create Date: 2025-09-01 14:34:45.123186
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '1d09a4ad0998'
-down_revision: Union[str, Sequence[str], None] = 'ddeda4036af2'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,46 @@
+"""add category change_seq and change clock
+
+Revision ID: 2c8e5f1a7d36
+Revises: 5b0c7e3d9a14
+Create Date: 2026-10-19 21:30:00.000000
+
+Existing rows get change_seq 0, so a full sync returns them in id order.
+Tenants get their clock row with their first stamp.
+Change tokens issued before this revision are rejected; clients resync.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8e5f1a7d36'
+down_revision: Union[str, Sequence[str], None] = '5b0c7e3d9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_change_clock',
+    sa.Column('tenant_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.add_column('categories', sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.execute("UPDATE categories SET change_seq = 0")
+    op.drop_index('ix_categories_tenant_id_updated_at_id', table_name='categories')
+    op.create_index('ix_categories_tenant_id_change_seq_id', 'categories', ['tenant_id', 'change_seq', 'id'], unique=False)
+    op.create_index('ix_categories_change_seq_pending', 'categories', ['id'], unique=False,
+                    postgresql_where=sa.text('change_seq IS NULL'), sqlite_where=sa.text('change_seq IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_change_seq_pending', table_name='categories',
+                  postgresql_where=sa.text('change_seq IS NULL'), sqlite_where=sa.text('change_seq IS NULL'))
+    op.drop_index('ix_categories_tenant_id_change_seq_id', table_name='categories')
+    op.create_index('ix_categories_tenant_id_updated_at_id', 'categories', ['tenant_id', 'updated_at', 'id'], unique=False)
+    op.drop_column('categories', 'change_seq')
+    op.drop_table('category_change_clock')
@@ -0,0 +1,30 @@
+"""add covering index for live categories
+
+Revision ID: 3f8a61d2c7b4
+Revises: e2b6d0a4c915
+Create Date: 2026-10-19 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a61d2c7b4'
+down_revision: Union[str, Sequence[str], None] = 'e2b6d0a4c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_categories_tenant_id_live', 'categories', ['tenant_id', 'id'], unique=False,
+                    postgresql_include=['name', 'created_by'],
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_tenant_id_live', table_name='categories')
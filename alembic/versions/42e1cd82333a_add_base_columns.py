@@ -1,32 +0,0 @@
-"""add base columns
-
-Revision ID: 42e1cd82333a
-Revises: 1da4c25e904d
-Create Date: 2025-09-01 14:28:59.025446
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '42e1cd82333a'
-down_revision: Union[str, Sequence[str], None] = '1da4c25e904d'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,42 @@
+"""add category hierarchy
+
+Revision ID: 4d98caaf21c4
+Revises: 5a46a2b89a39
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d98caaf21c4'
+down_revision: Union[str, Sequence[str], None] = '5a46a2b89a39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('categories', sa.Column('path', sa.String(length=1024), nullable=True))
+    op.add_column('categories', sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+    op.create_foreign_key(op.f('categories_parent_id_fkey'), 'categories', 'categories', ['parent_id'], ['id'])
+    op.create_index(op.f('ix_categories_parent_id'), 'categories', ['parent_id'], unique=False)
+    op.create_index('ix_categories_path', 'categories', ['path'], unique=False,
+                    postgresql_ops={'path': 'varchar_pattern_ops'})
+
+    # Existing categories become roots
+    op.execute("UPDATE categories SET path = '/' || CAST(id AS VARCHAR) || '/', depth = 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_path', table_name='categories')
+    op.drop_index(op.f('ix_categories_parent_id'), table_name='categories')
+    op.drop_constraint(op.f('categories_parent_id_fkey'), 'categories', type_='foreignkey')
+    op.drop_column('categories', 'depth')
+    op.drop_column('categories', 'path')
+    op.drop_column('categories', 'parent_id')
@@ -0,0 +1,71 @@
+"""create category stats tables
+
+Revision ID: 5b0c7e3d9a14
+Revises: 9d4b2e7a1f60
+Create Date: 2026-10-19 20:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0c7e3d9a14'
+down_revision: Union[str, Sequence[str], None] = '9d4b2e7a1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_stats_totals',
+    sa.Column('tenant_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('live', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.create_table('category_stats_by_creator',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('live', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id', 'created_by')
+    )
+    op.create_index('ix_category_stats_by_creator_tenant_id_live', 'category_stats_by_creator', ['tenant_id', 'live'], unique=False)
+    op.create_table('category_stats_by_day',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id', 'day')
+    )
+
+    # Backfill; from here on app.helpers.category_stats keeps them current
+    if context.get_context().dialect.name == 'postgresql':
+        day = "(created_at AT TIME ZONE 'UTC')::date"
+    else:
+        day = "date(created_at)"
+    op.execute(
+        "INSERT INTO category_stats_totals (tenant_id, total, live, refreshed_at) "
+        "SELECT tenant_id, count(*), sum(CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END), CURRENT_TIMESTAMP "
+        "FROM categories GROUP BY tenant_id"
+    )
+    op.execute(
+        "INSERT INTO category_stats_by_creator (tenant_id, created_by, total, live) "
+        "SELECT tenant_id, coalesce(created_by, 0), count(*), sum(CASE WHEN deleted_at IS NULL THEN 1 ELSE 0 END) "
+        "FROM categories GROUP BY tenant_id, coalesce(created_by, 0)"
+    )
+    op.execute(
+        "INSERT INTO category_stats_by_day (tenant_id, day, created) "
+        f"SELECT tenant_id, {day}, count(*) FROM categories GROUP BY tenant_id, {day}"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('category_stats_by_day')
+    op.drop_index('ix_category_stats_by_creator_tenant_id_live', table_name='category_stats_by_creator')
+    op.drop_table('category_stats_by_creator')
+    op.drop_table('category_stats_totals')
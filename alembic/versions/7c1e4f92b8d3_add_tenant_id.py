@@ -0,0 +1,61 @@
+"""add tenant_id to users, categories and audit_log
+
+Revision ID: 7c1e4f92b8d3
+Revises: a03f263adc94
+Create Date: 2026-10-19 18:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4f92b8d3'
+down_revision: Union[str, Sequence[str], None] = 'a03f263adc94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows all belong to the default tenant 0
+    op.add_column('users', sa.Column('tenant_id', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_users_tenant_id'), 'users', ['tenant_id'], unique=False)
+    op.add_column('audit_log', sa.Column('tenant_id', sa.Integer(), nullable=True))
+    op.create_index('ix_audit_log_tenant_id', 'audit_log', ['tenant_id', 'id'], unique=False)
+
+    op.add_column('categories', sa.Column('tenant_id', sa.Integer(), server_default='0', nullable=False))
+    op.drop_constraint(op.f('categories_name_key'), 'categories', type_='unique')
+    op.create_unique_constraint('uq_categories_tenant_id_name', 'categories', ['tenant_id', 'name'])
+    op.create_unique_constraint('uq_categories_tenant_id_id', 'categories', ['tenant_id', 'id'])
+    op.drop_constraint(op.f('categories_parent_id_fkey'), 'categories', type_='foreignkey')
+    op.create_foreign_key('fk_categories_tenant_id_parent_id', 'categories', 'categories',
+                          ['tenant_id', 'parent_id'], ['tenant_id', 'id'])
+    op.drop_index('ix_categories_path', table_name='categories')
+    op.create_index('ix_categories_tenant_id_path', 'categories', ['tenant_id', 'path'], unique=False,
+                    postgresql_ops={'path': 'varchar_pattern_ops'})
+    op.drop_index('ix_categories_updated_at_id', table_name='categories')
+    op.create_index('ix_categories_tenant_id_updated_at_id', 'categories', ['tenant_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_tenant_id_updated_at_id', table_name='categories')
+    op.create_index('ix_categories_updated_at_id', 'categories', ['updated_at', 'id'], unique=False)
+    op.drop_index('ix_categories_tenant_id_path', table_name='categories')
+    op.create_index('ix_categories_path', 'categories', ['path'], unique=False,
+                    postgresql_ops={'path': 'varchar_pattern_ops'})
+    op.drop_constraint('fk_categories_tenant_id_parent_id', 'categories', type_='foreignkey')
+    op.create_foreign_key(op.f('categories_parent_id_fkey'), 'categories', 'categories', ['parent_id'], ['id'])
+    op.drop_constraint('uq_categories_tenant_id_id', 'categories', type_='unique')
+    op.drop_constraint('uq_categories_tenant_id_name', 'categories', type_='unique')
+    # Fails if two tenants share a category name
+    op.create_unique_constraint(op.f('categories_name_key'), 'categories', ['name'])
+    op.drop_column('categories', 'tenant_id')
+
+    op.drop_index('ix_audit_log_tenant_id', table_name='audit_log')
+    op.drop_column('audit_log', 'tenant_id')
+    op.drop_index(op.f('ix_users_tenant_id'), table_name='users')
+    op.drop_column('users', 'tenant_id')
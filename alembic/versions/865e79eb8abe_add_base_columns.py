@@ -1,32 +0,0 @@
-"""add base columns
-
-Revision ID: 865e79eb8abe
-Revises: 42e1cd82333a
-Create Date: 2025-09-01 14:31:09.217624
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = '865e79eb8abe'
-down_revision: Union[str, Sequence[str], None] = '42e1cd82333a'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,41 @@
+"""create audit log table
+
+Revision ID: a03f263adc94
+Revises: cb0e2fd0513a
+Create Date: 2026-10-19 17:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a03f263adc94'
+down_revision: Union[str, Sequence[str], None] = 'cb0e2fd0513a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_log',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('table_name', sa.String(length=100), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(length=10), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('changes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_log_table_row_id', 'audit_log', ['table_name', 'row_id', 'id'], unique=False)
+    op.create_index('ix_audit_log_actor_id', 'audit_log', ['actor_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_log_actor_id', table_name='audit_log')
+    op.drop_index('ix_audit_log_table_row_id', table_name='audit_log')
+    op.drop_table('audit_log')
@@ -0,0 +1,50 @@
+"""add category change feed columns
+
+Revision ID: a5d79e09ee2a
+Revises: 4d98caaf21c4
+Create Date: 2026-10-19 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d79e09ee2a'
+down_revision: Union[str, Sequence[str], None] = '4d98caaf21c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    # updated_at doubles as the change token, so it must always be set
+    op.execute("UPDATE categories SET created_at = now() WHERE created_at IS NULL")
+    op.execute("UPDATE categories SET updated_at = created_at WHERE updated_at IS NULL")
+    op.alter_column('categories', 'created_at',
+               existing_type=sa.DateTime(timezone=True),
+               existing_server_default=sa.text('now()'),
+               nullable=False)
+    op.alter_column('categories', 'updated_at',
+               existing_type=sa.DateTime(timezone=True),
+               server_default=sa.text('now()'),
+               nullable=False)
+    op.create_index('ix_categories_updated_at_id', 'categories', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_updated_at_id', table_name='categories')
+    op.alter_column('categories', 'updated_at',
+               existing_type=sa.DateTime(timezone=True),
+               server_default=None,
+               nullable=True)
+    op.alter_column('categories', 'created_at',
+               existing_type=sa.DateTime(timezone=True),
+               existing_server_default=sa.text('now()'),
+               nullable=True)
+    op.drop_column('categories', 'deleted_at')
@@ -1,32 +0,0 @@
-"""Create users and posts tables
-
-Revision ID: c64ebeb575c2
-Revises: 1d09a4ad0998
-Create Date: 2025-09-01 14:37:11.490517
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'c64ebeb575c2'
-down_revision: Union[str, Sequence[str], None] = '1d09a4ad0998'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -1,68 +0,0 @@
-"""update  users table
-
-Revision ID: c84b0a138d8d
-Revises: 3a16888b2445
-Create Date: 2025-09-01 14:43:29.128575
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
-
-# revision identifiers, used by Alembic.
-revision: str = 'c84b0a138d8d'
-down_revision: Union[str, Sequence[str], None] = '3a16888b2445'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('users', sa.Column('username', sa.String(length=50), nullable=False))
-    op.add_column('users', sa.Column('full_name', sa.String(length=100), nullable=True))
-    op.add_column('users', sa.Column('is_active', sa.Integer(), nullable=True))
-    op.alter_column('users', 'email',
-               existing_type=sa.VARCHAR(length=200),
-               type_=sa.String(length=100),
-               existing_nullable=False)
-    op.alter_column('users', 'password',
-               existing_type=sa.VARCHAR(length=200),
-               type_=sa.String(length=255),
-               existing_nullable=False)
-    op.drop_constraint(op.f('users_name_key'), 'users', type_='unique')
-    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
-    op.drop_column('users', 'created_by')
-    op.drop_column('users', 'deleted_by')
-    op.drop_column('users', 'created_at')
-    op.drop_column('users', 'updated_at')
-    op.drop_column('users', 'name')
-    op.drop_column('users', 'updated_by')
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column('users', sa.Column('updated_by', sa.INTEGER(), autoincrement=False, nullable=True))
-    op.add_column('users', sa.Column('name', sa.VARCHAR(length=100), autoincrement=False, nullable=False))
-    op.add_column('users', sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), autoincrement=False, nullable=False))
-    op.add_column('users', sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), autoincrement=False, nullable=False))
-    op.add_column('users', sa.Column('deleted_by', sa.INTEGER(), autoincrement=False, nullable=True))
-    op.add_column('users', sa.Column('created_by', sa.INTEGER(), autoincrement=False, nullable=True))
-    op.drop_index(op.f('ix_users_username'), table_name='users')
-    op.create_unique_constraint(op.f('users_name_key'), 'users', ['name'], postgresql_nulls_not_distinct=False)
-    op.alter_column('users', 'password',
-               existing_type=sa.String(length=255),
-               type_=sa.VARCHAR(length=200),
-               existing_nullable=False)
-    op.alter_column('users', 'email',
-               existing_type=sa.String(length=100),
-               type_=sa.VARCHAR(length=200),
-               existing_nullable=False)
-    op.drop_column('users', 'is_active')
-    op.drop_column('users', 'full_name')
-    op.drop_column('users', 'username')
-    # ### end Alembic commands ###
@@ -1,32 +0,0 @@
-"""create users table
-
-Revision ID: ddeda4036af2
-Revises: 865e79eb8abe
-Create Date: 2025-09-01 14:31:55.648010
-
-"""
-from typing import Sequence, Union
-
-from alembic import op
-import sqlalchemy as sa
-
-
-# revision identifiers, used by Alembic.
-revision: str = 'ddeda4036af2'
-down_revision: Union[str, Sequence[str], None] = '865e79eb8abe'
-branch_labels: Union[str, Sequence[str], None] = None
-depends_on: Union[str, Sequence[str], None] = None
-
-
-def upgrade() -> None:
-    """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
-
-
-def downgrade() -> None:
-    """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
@@ -0,0 +1,81 @@
+"""partition categories by tenant (optional)
+
+Revision ID: e2b6d0a4c915
+Revises: 7c1e4f92b8d3
+Create Date: 2026-10-19 18:10:00.000000
+
+Only does something on Postgres when asked for, e.g.
+
+    alembic -x category_partitions=16 upgrade head
+
+which rebuilds categories as a table hash-partitioned on tenant_id with
+that many partitions, so per-tenant queries touch a single partition.
+Without the option the revision is a no-op; to partition later, downgrade
+to 7c1e4f92b8d3 and upgrade again with the option. The rebuild copies
+every row under an exclusive lock, so plan a maintenance window.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6d0a4c915'
+down_revision: Union[str, Sequence[str], None] = '7c1e4f92b8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partitions() -> int:
+    return int(context.get_x_argument(as_dictionary=True).get('category_partitions', 0))
+
+
+def _is_partitioned() -> bool:
+    return bool(op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'categories'::regclass"
+    ).scalar())
+
+
+def _rebuild(create_table: str, partitions: int = 0) -> None:
+    """Move all rows into a new categories table and recreate its keys and indexes."""
+    op.execute("ALTER TABLE categories RENAME TO categories_old")
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE categories_id_seq OWNED BY NONE")
+    op.execute(create_table)
+    for remainder in range(partitions):
+        op.execute(f"CREATE TABLE categories_p{remainder} PARTITION OF categories "
+                   f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})")
+    op.execute("INSERT INTO categories SELECT * FROM categories_old")
+    op.execute("DROP TABLE categories_old")
+    op.execute("ALTER SEQUENCE categories_id_seq OWNED BY categories.id")
+
+    # A partitioned table's unique keys must contain the partition key, hence (tenant_id, id)
+    op.create_primary_key('categories_pkey', 'categories', ['tenant_id', 'id'] if partitions else ['id'])
+    op.create_unique_constraint('uq_categories_tenant_id_name', 'categories', ['tenant_id', 'name'])
+    op.create_unique_constraint('uq_categories_tenant_id_id', 'categories', ['tenant_id', 'id'])
+    op.create_foreign_key('fk_categories_tenant_id_parent_id', 'categories', 'categories',
+                          ['tenant_id', 'parent_id'], ['tenant_id', 'id'])
+    op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+    op.create_index(op.f('ix_categories_parent_id'), 'categories', ['parent_id'], unique=False)
+    op.create_index('ix_categories_tenant_id_path', 'categories', ['tenant_id', 'path'], unique=False,
+                    postgresql_ops={'path': 'varchar_pattern_ops'})
+    op.create_index('ix_categories_tenant_id_updated_at_id', 'categories', ['tenant_id', 'updated_at', 'id'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = _partitions()
+    if not partitions or context.get_context().dialect.name != 'postgresql':
+        return
+    _rebuild(
+        "CREATE TABLE categories (LIKE categories_old INCLUDING DEFAULTS) PARTITION BY HASH (tenant_id)",
+        partitions,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Offline (--sql) there is no database to ask whether categories is partitioned
+    if context.get_context().dialect.name != 'postgresql' or context.is_offline_mode() or not _is_partitioned():
+        return
+    _rebuild("CREATE TABLE categories (LIKE categories_old INCLUDING DEFAULTS)")
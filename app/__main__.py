@@ -0,0 +1,108 @@
+"""
+Production entry point: python -m app
+
+Runs the API in several worker processes with the app preloaded in the
+master (gunicorn + uvicorn workers). Workers are recycled after
+--max-requests requests, and SIGTERM drains in-flight requests for up to
+--graceful-timeout seconds before the pools are disposed. Without gunicorn
+(e.g. on Windows) it falls back to uvicorn's own multi-process supervisor.
+"""
+import argparse
+import os
+
+
+def _default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app", description="Run the Product Category API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=_default_workers(),
+                        help="worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "10000")),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "1000")),
+                        help="random extra requests so workers do not recycle together")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WORKER_TIMEOUT", "60")),
+                        help="kill a worker that is silent for this many seconds")
+    return parser.parse_args(argv)
+
+
+def _worker_class() -> str:
+    try:
+        import uvicorn_worker  # noqa: F401
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def _when_ready(server):
+    # The master imported the app (and may have run create_all); make sure no
+    # pooled connection is inherited by the workers forked next.
+    from app.database import dispose_engines
+    dispose_engines()
+
+
+def _post_fork(server, worker):
+    from app.database import dispose_engines
+    dispose_engines(close=False)
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    from app.main import app
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": _worker_class(),
+                "preload_app": True,
+                "max_requests": args.max_requests,
+                "max_requests_jitter": args.max_requests_jitter if args.max_requests else 0,
+                "graceful_timeout": args.graceful_timeout,
+                "timeout": args.timeout,
+                "when_ready": _when_ready,
+                "post_fork": _post_fork,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Application().run()
+
+
+def run_uvicorn(args):
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn not installed, falling back to uvicorn workers (no preload)")
+        run_uvicorn(args)
+        return
+    run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# Audit trail: session events capture changes, a background writer stores them in bulk
+from .capture import AUDIT_ENABLED
+from .writer import AuditWriter, audit_writer
+
+__all__ = ['AUDIT_ENABLED', 'AuditWriter', 'audit_writer']
@@ -0,0 +1,184 @@
+"""
+Captures inserts, updates and deletes of every BaseMixin model.
+
+Records collect on the session while it flushes and go to the audit writer
+only once the transaction commits; a rollback discards them. Nothing is
+written to the database on the request path.
+"""
+import json
+import os
+from datetime import datetime, timezone
+from functools import partial
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.audit.writer import audit_writer
+from app.models.base_migration import BaseMixin
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "1") == "1"
+
+# Bookkeeping columns that every update touches anyway
+IGNORED_COLUMNS = {"updated_at", "change_seq"}
+
+
+def _dump(changes: dict) -> str:
+    return json.dumps(changes, default=str, sort_keys=True)
+
+
+def _row_id(state):
+    # The identity key is only assigned after after_flush, so read the column
+    mapper = state.mapper
+    if len(mapper.primary_key) != 1:
+        return None
+    return state.dict.get(mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+
+def _inserted(state) -> dict:
+    # Only what is loaded; reading server defaults here would query mid-flush
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict and state.dict[attr.key] is not None
+    }
+
+
+def _updated(state) -> dict:
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        if attr.key in IGNORED_COLUMNS:
+            continue
+        history = state.attrs[attr.key].history
+        if history.added or history.deleted:
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old != new:
+                changes[attr.key] = [old, new]
+    return changes
+
+
+def _pending(session) -> dict:
+    # Keyed by (table, row id) so an insert and the updates of the same
+    # transaction end up as one record
+    return session.info.setdefault("audit", {})
+
+
+def _capture_flush(session, flush_context):
+    pending = _pending(session)
+    for obj in session.new:
+        if isinstance(obj, BaseMixin):
+            state = inspect(obj)
+            key = (state.mapper.local_table.name, _row_id(state))
+            pending[key] = {"action": "insert", "actor_id": state.dict.get("created_by"), "changes": _inserted(state)}
+
+    for obj in session.dirty:
+        if not isinstance(obj, BaseMixin) or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        changes = _updated(state)
+        if not changes:
+            continue
+        key = (state.mapper.local_table.name, _row_id(state))
+        record = pending.get(key)
+        if record is None:
+            pending[key] = {"action": "update", "actor_id": state.dict.get("updated_by"), "changes": changes}
+        elif record["action"] == "insert":
+            record["changes"].update({column: new for column, (old, new) in changes.items()})
+        else:
+            for column, (old, new) in changes.items():
+                record["changes"][column] = [record["changes"].get(column, [old])[0], new]
+
+    for obj in session.deleted:
+        if isinstance(obj, BaseMixin):
+            state = inspect(obj)
+            key = (state.mapper.local_table.name, _row_id(state))
+            pending[key] = {"action": "delete", "actor_id": state.dict.get("deleted_by"), "changes": None}
+
+
+class _BulkStatement:
+    """
+    A set-based statement, compiled for its audit record only when the
+    writer renders it, off the request path and once per statement.
+    """
+
+    def __init__(self, statement):
+        self.statement = statement
+        self._compiled = None
+
+    def render(self, parameters: dict) -> dict:
+        if self._compiled is None:
+            self._compiled = self.statement.compile()
+        params = {**self._compiled.params, **parameters}
+        return self._record(params, {"statement": str(self._compiled), "params": params})
+
+    @staticmethod
+    def render_row(parameters: dict) -> dict:
+        # One parameter set of an executemany by primary key: the values are the change
+        return _BulkStatement._record(parameters, {"params": parameters})
+
+    @staticmethod
+    def _record(params: dict, changes: dict) -> dict:
+        return {"actor_id": params.get("deleted_by") or params.get("updated_by"), "changes": _dump(changes)}
+
+
+def _capture_bulk(orm_execute_state):
+    """Set-based statements (tree moves, soft deletes, imports) as one record per parameter set."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, BaseMixin):
+        return
+
+    statement = _BulkStatement(orm_execute_state.statement)
+    parameters = orm_execute_state.parameters
+    # executemany (session.execute(update(Model), [{...}, ...])) passes a list;
+    # those are by primary key, so each set is one row
+    many = isinstance(parameters, list)
+    primary_key = mapper.primary_key[0].key if many and len(mapper.primary_key) == 1 else None
+    action = "insert" if orm_execute_state.is_insert else "update" if orm_execute_state.is_update else "delete"
+    bulk = orm_execute_state.session.info.setdefault("audit_bulk", [])
+    for params in parameters if many else [parameters or {}]:
+        bulk.append({
+            "table_name": mapper.local_table.name,
+            "row_id": params.get(primary_key) if primary_key else None,
+            "action": action,
+            "actor_id": None,
+            "changes": None,
+            "render": partial(statement.render_row if many else statement.render, dict(params)),
+        })
+
+
+def _enqueue(session):
+    pending = session.info.pop("audit", None)
+    bulk = session.info.pop("audit_bulk", None)
+    if not pending and not bulk:
+        return
+    now = datetime.now(timezone.utc)
+    tenant_id = session.info.get("tenant_id")
+    records = [
+        {
+            "tenant_id": tenant_id,
+            "table_name": table_name,
+            "row_id": row_id,
+            "action": record["action"],
+            "actor_id": record["actor_id"],
+            "changes": _dump(record["changes"]) if record["changes"] is not None else None,
+            "created_at": now,
+        }
+        for (table_name, row_id), record in (pending or {}).items()
+    ]
+    for record in bulk or []:
+        records.append({**record, "tenant_id": tenant_id, "created_at": now})
+    audit_writer.add(records)
+
+
+def _discard(session):
+    session.info.pop("audit", None)
+    session.info.pop("audit_bulk", None)
+
+
+if AUDIT_ENABLED:
+    event.listen(Session, "after_flush", _capture_flush)
+    event.listen(Session, "do_orm_execute", _capture_bulk)
+    event.listen(Session, "after_commit", _enqueue)
+    event.listen(Session, "after_rollback", _discard)
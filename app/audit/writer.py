@@ -0,0 +1,146 @@
+import csv
+import io
+import os
+import threading
+from typing import List
+
+from sqlalchemy import insert
+
+from app.database import engine
+from app.models.audit import AuditLog
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1"))
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "20000"))
+
+COLUMNS = ("tenant_id", "table_name", "row_id", "action", "actor_id", "changes", "created_at")
+
+
+class AuditWriter:
+    """
+    Buffers audit records in memory and writes them in bulk.
+
+    A background thread flushes whenever batch_size records are waiting or
+    flush_seconds have passed. When the buffer is full the committing caller
+    flushes synchronously instead, so a slow database slows writers down
+    rather than growing memory without bound.
+    """
+
+    def __init__(self, bind=engine, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_seconds: float = AUDIT_FLUSH_SECONDS, max_buffer: int = AUDIT_BUFFER_SIZE):
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self._buffer: List[dict] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # keeps batches in commit order
+        self._thread = None
+        self._stopping = threading.Event()
+        self.metrics = {"written": 0, "flushes": 0, "sync_flushes": 0, "dropped": 0, "errors": 0}
+
+    def add(self, records: List[dict]):
+        with self._cond:
+            self._buffer.extend(records)
+            full = len(self._buffer) >= self.max_buffer
+            if full:
+                self.metrics["sync_flushes"] += 1
+            elif len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+        if full:
+            # Backpressure: the caller pays for the write
+            self.flush()
+
+    def _take(self) -> List[dict]:
+        with self._cond:
+            batch, self._buffer = self._buffer, []
+        return batch
+
+    def flush(self):
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return
+            try:
+                self._render(batch)
+                self._write(batch)
+            except Exception as e:
+                self.metrics["errors"] += 1
+                with self._cond:
+                    # Retry with the next flush; beyond capacity the oldest records go
+                    keep = max(self.max_buffer - len(self._buffer), 0)
+                    self.metrics["dropped"] += max(len(batch) - keep, 0)
+                    self._buffer[:0] = batch[len(batch) - keep:] if keep else []
+                print(f"❌ Audit flush failed ({len(batch)} records): {e}")
+                return
+            self.metrics["written"] += len(batch)
+            self.metrics["flushes"] += 1
+
+    @staticmethod
+    def _render(batch: List[dict]):
+        # Records of set-based statements carry a render() for actor_id and
+        # changes, so the statement is compiled here instead of on the request path
+        for record in batch:
+            render = record.pop("render", None)
+            if render is not None:
+                record.update(render())
+
+    def _write(self, batch: List[dict]):
+        with self.bind.begin() as connection:
+            driver = connection.dialect.driver
+            if connection.dialect.name == "postgresql" and driver in ("psycopg2", "psycopg"):
+                self._copy(connection, batch, driver)
+            else:
+                # executemany; SQLAlchemy batches it into multi-row INSERTs
+                connection.execute(insert(AuditLog), batch)
+
+    @staticmethod
+    def _copy(connection, batch: List[dict], driver: str):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in batch:
+            writer.writerow([
+                r"\N" if record[column] is None else record[column] for column in COLUMNS
+            ])
+        sql = f"COPY audit_log ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        cursor = connection.connection.cursor()
+        try:
+            if driver == "psycopg2":
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            with self._cond:
+                if len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_seconds)
+            self.flush()
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the flusher and write whatever is still buffered."""
+        self._stopping.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {**self.metrics, "buffered": buffered, "batch_size": self.batch_size,
+                "flush_seconds": self.flush_seconds, "max_buffer": self.max_buffer}
+
+
+audit_writer = AuditWriter()
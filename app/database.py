@@ -1,9 +1,13 @@
+import itertools
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # Load environment variables
 load_dotenv()
@@ -15,23 +19,200 @@ DB_DATABASE = os.getenv("DB_DATABASE", "fastapi_db")
 DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "admin")
 
-DATABASE_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_DATABASE}"
+# Read replicas: comma separated "host" or "host:port" entries sharing the
+# primary's credentials, or full URLs via DB_READ_URLS (e.g. two SQLite files).
+DB_READ_HOSTS = os.getenv("DB_READ_HOSTS", os.getenv("DB_READ_HOST", ""))
+DB_READ_URLS = os.getenv("DB_READ_URLS", "")
+DB_READ_STRATEGY = os.getenv("DB_READ_STRATEGY", "round_robin")  # round_robin | least_conn
+DB_READ_RETRY_SECONDS = float(os.getenv("DB_READ_RETRY_SECONDS", "30"))
+DB_READ_STICKY_SECONDS = float(os.getenv("DB_READ_STICKY_SECONDS", "5"))
+
+# Statement caching: size of SQLAlchemy's compiled-SQL cache per engine, and the
+# number of executions after which psycopg 3 ("DB_DRIVER=psycopg") switches a
+# query to a server-side prepared statement (0 = prepare immediately).
+DB_DRIVER = os.getenv("DB_DRIVER", "")
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _postgres_url(host: str, port: str) -> str:
+    scheme = f"postgresql+{DB_DRIVER}" if DB_DRIVER else "postgresql"
+    return f"{scheme}://{DB_USERNAME}:{DB_PASSWORD}@{host}:{port}/{DB_DATABASE}"
+
+
+def _read_urls() -> list:
+    if DB_READ_URLS:
+        return [url.strip() for url in DB_READ_URLS.split(",") if url.strip()]
+
+    urls = []
+    for entry in DB_READ_HOSTS.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        urls.append(_postgres_url(host, port or DB_PORT))
+    return urls
+
+
+def _create_engine(url: str, **kwargs):
+    options = {"query_cache_size": DB_QUERY_CACHE_SIZE}
+    if url.startswith("postgresql+psycopg:") and DB_PREPARE_THRESHOLD != "":
+        options["connect_args"] = {"prepare_threshold": int(DB_PREPARE_THRESHOLD)}
+    options.update(kwargs)
+    return create_engine(url, **options)
+
+
+DATABASE_URL = os.getenv("DATABASE_URL") or _postgres_url(DB_HOST, DB_PORT)
 print(DATABASE_URL)
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = _create_engine(DATABASE_URL)
+
+
+class ReplicaSet:
+    """Read engines with health tracking and round-robin/least-connection selection."""
+
+    def __init__(self, engines, strategy: str = "round_robin", retry_seconds: float = 30):
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self._down_until = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+        for read_engine in self.engines:
+            event.listen(read_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # Connection refused / dropped: take the replica out of rotation for a while
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, read_engine):
+        with self._lock:
+            self._down_until[read_engine] = time.monotonic() + self.retry_seconds
+        print(f"Read replica marked unhealthy: {read_engine.url.render_as_string(hide_password=True)}")
+
+    def healthy(self) -> list:
+        now = time.monotonic()
+        return [e for e in self.engines if self._down_until.get(e, 0) <= now]
+
+    def pick(self):
+        """Return a healthy replica engine, or None when the primary should be used."""
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        if self.strategy == "least_conn":
+            return min(candidates, key=lambda e: getattr(e.pool, "checkedout", lambda: 0)())
+        return candidates[next(self._counter) % len(candidates)]
+
+
+replicas = ReplicaSet(
+    [_create_engine(url, pool_pre_ping=True) for url in _read_urls()],
+    strategy=DB_READ_STRATEGY,
+    retry_seconds=DB_READ_RETRY_SECONDS,
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs of read-only sessions to a replica.
+
+    Everything else goes to the primary, and once a session has written it
+    stays on the primary so it can read its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or (clause is not None and not getattr(clause, "is_select", False)):
+            self.info["wrote"] = True
+        if self.info.get("wrote") or not self.info.get("read_only"):
+            return engine
+
+        # Pin one replica per session so a transaction sees a single snapshot
+        replica = self.info.get("replica")
+        if replica is None or replica not in replicas.healthy():
+            replica = replicas.pick()
+            if replica is None:
+                return engine
+            self.info["replica"] = replica
+        return replica
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
-try:
-    engine.connect()
-    print("DB connected!")
-except Exception as e:
-    print("DB connection failed:", e)
+
+
+def dispose_engines(close: bool = True):
+    """
+    Drop pooled connections of the primary and replica engines.
+
+    Called with close=False right after a fork so the child never reuses the
+    parent's sockets, and with close=True on shutdown.
+    """
+    engine.dispose(close=close)
+    for read_engine in replicas.engines:
+        read_engine.dispose(close=close)
+
+
+# Users that wrote recently read from the primary until replicas catch up
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+
+
+def _principal_id(request: Request):
+    user = getattr(request.state, "user", None)
+    return getattr(user, "id", None)
+
+
+def _wrote_recently(principal_id) -> bool:
+    if principal_id is None:
+        return False
+    with _recent_writers_lock:
+        wrote_at = _recent_writers.get(principal_id)
+        if wrote_at is None:
+            return False
+        if time.monotonic() - wrote_at > DB_READ_STICKY_SECONDS:
+            del _recent_writers[principal_id]
+            return False
+    return True
+
+
+def _remember_writer(principal_id):
+    if principal_id is None:
+        return
+    now = time.monotonic()
+    with _recent_writers_lock:
+        # Kept in write order, so the expired entries are the oldest ones
+        _recent_writers.pop(principal_id, None)
+        _recent_writers[principal_id] = now
+        while True:
+            oldest = next(iter(_recent_writers))
+            if now - _recent_writers[oldest] <= DB_READ_STICKY_SECONDS:
+                break
+            del _recent_writers[oldest]
+
+
+def read_session(tenant_id=None) -> Session:
+    """Create a session whose reads may be served by a replica."""
+    db = SessionLocal()
+    db.info["read_only"] = True
+    db.info["tenant_id"] = tenant_id
+    return db
 
 
 # Dependency for DB session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    principal_id = _principal_id(request)
+    # Scopes tenant-aware models to the caller's tenant (see app.helpers.tenancy)
+    db.info["tenant_id"] = getattr(getattr(request.state, "user", None), "tenant_id", None)
+    read_only = request.method in READ_METHODS and not getattr(request.state, "wrote", False)
+    db.info["read_only"] = read_only and not _wrote_recently(principal_id)
     try:
         yield db
     finally:
+        if db.info.get("wrote"):
+            request.state.wrote = True
+            _remember_writer(principal_id)
         db.close()
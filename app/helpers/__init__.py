@@ -1,5 +1,5 @@
 # This file makes the helpers directory a Python package
-from .response import (error_response, paginated_response, response,
-                       success_response)
+from .response import (error_json_response, error_response,
+                       paginated_response, response, success_response)
 
-__all__ = ['response', 'success_response', 'error_response', 'paginated_response']
+__all__ = ['response', 'success_response', 'error_response', 'error_json_response', 'paginated_response']
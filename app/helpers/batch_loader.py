@@ -0,0 +1,66 @@
+"""
+Dataloader-style coalescing of concurrent single-key lookups.
+
+Lookups that arrive on the event loop within `window` seconds of each other
+are answered by one batched call, run on the threadpool. The call belongs to
+no single request: it runs in a fresh context, under the longest query
+deadline among its callers, so one caller's disconnect or deadline does not
+cancel it for the rest.
+"""
+import asyncio
+import contextvars
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.middleware.deadline import Deadline, current_deadline, longest_deadline, use_deadline
+
+
+class BatchLoader:
+    def __init__(self, batch_fn: Callable[[list], Dict[Hashable, Any]], window: float = 0.002, max_batch: int = 500):
+        # batch_fn(keys) -> {key: value}; keys it leaves out resolve to None
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._deadlines: List[Optional[Deadline]] = []  # of every caller of the pending batch
+        self._handle = None
+        self.metrics = {"loads": 0, "batches": 0}
+
+    async def load(self, key: Hashable):
+        self.metrics["loads"] += 1
+        self._deadlines.append(current_deadline())
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._handle is None:
+                self._handle = asyncio.get_running_loop().call_later(self.window, self._dispatch)
+        # Shielded: one caller going away must not cancel the others' result
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        deadlines, self._deadlines = self._deadlines, []
+        if batch:
+            self.metrics["batches"] += 1
+            # Not the context of whichever request opened the batch
+            asyncio.get_running_loop().create_task(self._run(batch, deadlines), context=contextvars.Context())
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future], deadlines: List[Optional[Deadline]]):
+        try:
+            with use_deadline(longest_deadline(deadlines)):
+                values = await run_in_threadpool(self.batch_fn, list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,461 @@
+"""
+Bulk export and import of categories.
+
+Exports stream straight from a server-side cursor (or COPY TO on Postgres)
+in fixed-size chunks. Imports go through a temporary staging table that is
+filled with COPY FROM on Postgres, then merged into categories with a few
+set-based statements. Memory stays flat whatever the row count.
+"""
+import codecs
+import csv
+import io
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import (Column, Index, Integer, MetaData, String, Table,
+                        and_, cast, exists, func, literal, select, update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from app.helpers.tenancy import DEFAULT_TENANT_ID, current_tenant
+from app.models.category import Category
+
+CATEGORY_IO_BATCH_SIZE = int(os.getenv("CATEGORY_IO_BATCH_SIZE", "5000"))
+CATEGORY_IMPORT_MAX_ERRORS = int(os.getenv("CATEGORY_IMPORT_MAX_ERRORS", "1000"))
+
+EXPORT_COLUMNS = (
+    "id", "name", "description", "parent_id", "path", "depth",
+    "created_by", "updated_by", "deleted_by", "created_at", "updated_at", "deleted_at",
+)
+IMPORT_COLUMNS = ("name", "description", "parent_id")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # parquet export is optional
+    pyarrow = None
+
+
+class ImportFormatError(ValueError):
+    """Raised for an import that cannot start at all (bad header, unknown format)."""
+
+
+# ---------------- Export ----------------
+
+def _export_select(db: Session, include_deleted: bool):
+    stmt = select(*(getattr(Category, column) for column in EXPORT_COLUMNS)).order_by(Category.id)
+    # Explicit, as COPY below runs the compiled SQL outside the ORM's tenant scoping
+    tenant_id = current_tenant(db)
+    if tenant_id is not None:
+        stmt = stmt.where(Category.tenant_id == tenant_id)
+    if not include_deleted:
+        stmt = stmt.where(Category.deleted_at.is_(None))
+    return stmt
+
+
+def _row_batches(db: Session, include_deleted: bool) -> Iterator[list]:
+    result = db.execute(
+        _export_select(db, include_deleted),
+        execution_options={"stream_results": True, "yield_per": CATEGORY_IO_BATCH_SIZE},
+    )
+    yield from result.partitions()
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _export_csv(db: Session, include_deleted: bool) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in _row_batches(db, include_deleted):
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _export_ndjson(db: Session, include_deleted: bool) -> Iterator[bytes]:
+    for rows in _row_batches(db, include_deleted):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_csv_value) + "\n" for row in rows
+        ).encode()
+
+
+class _Sink:
+    """Write-only file for pyarrow that hands out what was written so far."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _export_parquet(db: Session, include_deleted: bool) -> Iterator[bytes]:
+    schema = pyarrow.schema([
+        ("id", pyarrow.int64()), ("name", pyarrow.string()), ("description", pyarrow.string()),
+        ("parent_id", pyarrow.int64()), ("path", pyarrow.string()), ("depth", pyarrow.int32()),
+        ("created_by", pyarrow.int64()), ("updated_by", pyarrow.int64()), ("deleted_by", pyarrow.int64()),
+        ("created_at", pyarrow.timestamp("us", tz="UTC")), ("updated_at", pyarrow.timestamp("us", tz="UTC")),
+        ("deleted_at", pyarrow.timestamp("us", tz="UTC")),
+    ])
+    sink = _Sink()
+    # One row group per batch, so nothing but the current batch is held
+    with pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode="w"), schema) as writer:
+        for rows in _row_batches(db, include_deleted):
+            columns = list(zip(*rows))
+            writer.write_batch(pyarrow.record_batch(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+class _QueueWriter:
+    """File object for psycopg2's copy_expert that feeds a bounded queue."""
+
+    def __init__(self, chunks: queue.Queue):
+        self.chunks = chunks
+        self.cancelled = threading.Event()
+
+    def write(self, data):
+        data = data.encode() if isinstance(data, str) else bytes(data)
+        while True:
+            if self.cancelled.is_set():
+                # Aborts the COPY once the client has gone away
+                raise IOError("export cancelled")
+            try:
+                self.chunks.put(data, timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+
+def _copy_sql(db: Session, include_deleted: bool) -> str:
+    query = _export_select(db, include_deleted).compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+
+
+def _export_copy(db: Session, include_deleted: bool) -> Iterator[bytes]:
+    """CSV straight from the server with COPY TO, no rows are built in Python."""
+    dbapi_connection = db.connection().connection
+    sql = _copy_sql(db, include_deleted)
+    cursor = dbapi_connection.cursor()
+    try:
+        if db.get_bind().dialect.driver == "psycopg":
+            with cursor.copy(sql) as copy:
+                for data in copy:
+                    yield bytes(data)
+            return
+
+        # psycopg2 only copies into a file; run it on a thread and stream the pieces
+        chunks = queue.Queue(maxsize=64)
+        writer = _QueueWriter(chunks)
+        failure = []
+
+        def run():
+            try:
+                cursor.copy_expert(sql, writer, size=64 * 1024)
+            except Exception as e:
+                failure.append(e)
+            finally:
+                chunks.put(None)
+
+        thread = threading.Thread(target=run, name="category-export", daemon=True)
+        thread.start()
+        try:
+            pending = []
+            while (data := chunks.get()) is not None:
+                pending.append(data)
+                if len(pending) >= 16:
+                    yield b"".join(pending)
+                    pending = []
+            if pending:
+                yield b"".join(pending)
+            if failure:
+                raise failure[0]
+        finally:
+            writer.cancelled.set()
+            while thread.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    finally:
+        cursor.close()
+
+
+def can_copy(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg")
+
+
+def export_categories(db: Session, format: str, include_deleted: bool = False) -> Iterator[bytes]:
+    """Chunks of the session tenant's categories in csv, ndjson or parquet."""
+    if format == "parquet":
+        if pyarrow is None:
+            raise ValueError("Parquet export needs pyarrow installed")
+        return _export_parquet(db, include_deleted)
+    if format == "csv":
+        return _export_copy(db, include_deleted) if can_copy(db) else _export_csv(db, include_deleted)
+    if format == "ndjson":
+        return _export_ndjson(db, include_deleted)
+    raise ValueError(f"Unknown export format: {format}")
+
+
+# ---------------- Import ----------------
+
+staging_metadata = MetaData()
+
+# Per-connection temp table; "line" ties every staged row back to the input
+staging = Table(
+    "category_import",
+    staging_metadata,
+    Column("line", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("description", String(255)),
+    Column("parent_id", Integer),
+    # Duplicate detection would otherwise be quadratic
+    Index("ix_category_import_name", "name"),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a byte stream into lines without ever holding all of it."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _validate(record: dict) -> dict:
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name is required")
+    if len(name) > 100:
+        raise ValueError("name is longer than 100 characters")
+    description = record.get("description")
+    if description in ("", None):
+        description = None
+    elif not isinstance(description, str):
+        raise ValueError("description must be a string")
+    elif len(description) > 255:
+        raise ValueError("description is longer than 255 characters")
+    parent_id = record.get("parent_id")
+    if parent_id in ("", None):
+        parent_id = None
+    else:
+        try:
+            parent_id = int(parent_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"parent_id is not an integer: {parent_id!r}")
+    return {"name": name.strip(), "description": description, "parent_id": parent_id}
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[tuple]:
+    """(line, row or None, error) for every CSV record after the header."""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or "name" not in reader.fieldnames:
+        raise ImportFormatError("CSV header must contain a name column")
+    for record in reader:
+        try:
+            yield reader.line_num, _validate(record), None
+        except ValueError as e:
+            yield reader.line_num, None, str(e)
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[tuple]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("line is not a JSON object")
+            yield number, _validate(record), None
+        except ValueError as e:
+            yield number, None, str(e)
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+class CategoryImport:
+    """
+    Stages validated rows, then merges them into the session tenant's
+    categories by name.
+
+    New names are inserted under parent_id (which must already exist);
+    existing names get the new description and are restored if they were
+    soft-deleted. Existing categories are not re-parented, use
+    PUT /categories/{id}/parent for that. The caller commits.
+    """
+
+    def __init__(self, db: Session, user_id: Optional[int] = None):
+        self.db = db
+        self.user_id = user_id
+        tenant_id = current_tenant(db)
+        self.tenant_id = DEFAULT_TENANT_ID if tenant_id is None else tenant_id
+        self.connection = db.connection()
+        self.errors: List[dict] = []
+        self.error_count = 0
+        self.staged = 0
+        # A failed import can leave the table behind on a pooled SQLite connection
+        staging.drop(self.connection, checkfirst=True)
+        staging.create(self.connection)
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < CATEGORY_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def load(self, parsed: Iterable[tuple]):
+        batch = []
+        for line, row, error in parsed:
+            if error is not None:
+                self.error(line, error)
+                continue
+            batch.append({"line": line, **row})
+            if len(batch) >= CATEGORY_IO_BATCH_SIZE:
+                self._stage(batch)
+                batch = []
+        if batch:
+            self._stage(batch)
+
+    def _stage(self, batch: List[dict]):
+        self.staged += len(batch)
+        if not can_copy(self.db):
+            self.connection.execute(staging.insert(), batch)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow([r"\N" if row[column] is None else row[column]
+                             for column in ("line", *IMPORT_COLUMNS)])
+        sql = f"COPY category_import (line, {', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        cursor = self.connection.connection.cursor()
+        try:
+            if self.db.get_bind().dialect.driver == "psycopg2":
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+    def _reject(self, condition, message):
+        """Report and drop the staged rows matching condition."""
+        rejected = self.connection.execute(select(staging.c.line).where(condition).order_by(staging.c.line))
+        lines = [line for line, in rejected]
+        for line in lines:
+            self.error(line, message)
+        if lines:
+            self.connection.execute(staging.delete().where(condition))
+            self.staged -= len(lines)
+
+    def merge(self) -> dict:
+        earlier = staging.alias("earlier")
+        self._reject(
+            exists().where(earlier.c.name == staging.c.name, earlier.c.line < staging.c.line),
+            "duplicate name, an earlier line already has it",
+        )
+        self._reject(
+            and_(
+                staging.c.parent_id.is_not(None),
+                ~exists().where(Category.tenant_id == self.tenant_id, Category.id == staging.c.parent_id,
+                                Category.deleted_at.is_(None)),
+            ),
+            "parent_id does not exist",
+        )
+
+        updated = self.connection.scalar(
+            select(func.count()).select_from(staging).where(
+                exists().where(Category.tenant_id == self.tenant_id, Category.name == staging.c.name)
+            )
+        )
+
+        dialect = self.db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(Category).from_select(
+            ["tenant_id", "name", "description", "parent_id", "created_by", "updated_by"],
+            select(literal(self.tenant_id, Integer), staging.c.name, staging.c.description, staging.c.parent_id,
+                   literal(self.user_id, Integer), literal(self.user_id, Integer))
+            .order_by(staging.c.line),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Category.tenant_id, Category.name],
+            set_={
+                "description": stmt.excluded.description,
+                "updated_by": stmt.excluded.updated_by,
+                "updated_at": func.now(),
+                "change_seq": None,  # upserts skip onupdate; stamped at commit
+                "deleted_at": None,
+                "deleted_by": None,
+            },
+        )
+        self.db.execute(stmt)
+
+        # Place the new rows in the tree
+        parent = aliased(Category)
+        parent_path = select(parent.path).where(parent.id == Category.parent_id).scalar_subquery()
+        parent_depth = select(parent.depth).where(parent.id == Category.parent_id).scalar_subquery()
+        self.db.execute(
+            update(Category)
+            .where(Category.path.is_(None))
+            .values(
+                path=func.coalesce(parent_path, "/") + cast(Category.id, String) + "/",
+                depth=func.coalesce(parent_depth + 1, 0),
+            )
+            .execution_options(synchronize_session=False, category_stats=False)
+        )
+        staging.drop(self.connection)
+        return {"inserted": self.staged - updated, "updated": updated}
+
+    def result(self, merged: dict) -> dict:
+        errors = sorted(self.errors, key=lambda error: error["line"])
+        return {**merged, "error_count": self.error_count, "errors": errors}
@@ -0,0 +1,339 @@
+"""
+Precomputed category counts for GET /categories/stats.
+
+Three summary tables per tenant hold the totals, the counts per creator and
+the categories created per UTC day, so a stats request reads a handful of
+rows whatever the size of categories.
+
+New categories are added to the summaries in the flush that inserts them.
+Soft deletes take their rows off the live counts as they run. Anything
+else that can move a count (imports, hard deletes, ORM changes to
+created_by or deleted_at) recounts the tenant before the transaction
+commits. Either way the summaries commit together with the
+rows. A background refresh recounts every tenant each
+CATEGORY_STATS_REFRESH_SECONDS to repair drift from writes that bypass the
+ORM; with CATEGORY_STATS_INCREMENTAL=0 it is the only maintenance, and its
+interval becomes the staleness bound.
+
+Set-based statements that keep the counts right themselves (soft deletes
+report their rows to count_deleted) or cannot change them (tree moves) opt
+out with ``.execution_options(category_stats=False)``.
+"""
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Set
+
+from sqlalchemy import Date, case, cast, delete, event, func, inspect, literal, select, union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.helpers.tenancy import DEFAULT_TENANT_ID
+from app.models.category import Category
+from app.models.category_stats import (CategoryStatsByCreator, CategoryStatsByDay,
+                                       CategoryStatsTotals)
+
+CATEGORY_STATS_INCREMENTAL = os.getenv("CATEGORY_STATS_INCREMENTAL", "1") == "1"
+# Full recount of every tenant; 0 disables it
+CATEGORY_STATS_REFRESH_SECONDS = float(os.getenv("CATEGORY_STATS_REFRESH_SECONDS", "3600"))
+
+# Columns whose change on an existing row moves a count
+COUNTED_COLUMNS = ("tenant_id", "created_by", "created_at", "deleted_at")
+
+# Every tenant needs a recount (a set-based statement outside any tenant)
+ALL_TENANTS = None
+
+
+def _insert(connection):
+    return postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+
+
+def _day(connection, column):
+    if connection.dialect.name == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return func.date(column)
+
+
+def _add(connection, totals: Dict[int, list], creators: Dict[tuple, list], days: Dict[tuple, int]):
+    """
+    Increment the summaries by the given deltas, creating missing rows.
+
+    The totals upsert goes first and row-locks each tenant's totals until
+    the transaction ends, which is what serializes it with recount_tenant.
+    """
+    insert = _insert(connection)
+    for tenant_id, _ in [*creators, *days]:
+        totals.setdefault(tenant_id, [0, 0])
+    if totals:
+        stmt = insert(CategoryStatsTotals)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CategoryStatsTotals.tenant_id],
+                set_={"total": CategoryStatsTotals.total + stmt.excluded.total,
+                      "live": CategoryStatsTotals.live + stmt.excluded.live},
+            ),
+            # Tenant order, so two transactions lock their tenants in the same order
+            [{"tenant_id": tenant_id, "total": total, "live": live}
+             for tenant_id, (total, live) in sorted(totals.items())],
+        )
+    if creators:
+        stmt = insert(CategoryStatsByCreator)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CategoryStatsByCreator.tenant_id, CategoryStatsByCreator.created_by],
+                set_={"total": CategoryStatsByCreator.total + stmt.excluded.total,
+                      "live": CategoryStatsByCreator.live + stmt.excluded.live},
+            ),
+            [{"tenant_id": tenant_id, "created_by": created_by, "total": total, "live": live}
+             for (tenant_id, created_by), (total, live) in creators.items()],
+        )
+    if days:
+        stmt = insert(CategoryStatsByDay)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CategoryStatsByDay.tenant_id, CategoryStatsByDay.day],
+                set_={"created": CategoryStatsByDay.created + stmt.excluded.created},
+            ),
+            [{"tenant_id": tenant_id, "day": day, "created": created} for (tenant_id, day), created in days.items()],
+        )
+
+
+def count_deleted(db: Session, tenant_id: int, creators: Dict[int, int]):
+    """Take soft-deleted categories, counted per creator (0 for none), off the live counts."""
+    if not (CATEGORY_STATS_INCREMENTAL and creators):
+        return
+    deleted = sum(creators.values())
+    _add(db.connection(), {tenant_id: [0, -deleted]},
+         {(tenant_id, created_by): [0, -count] for created_by, count in creators.items()}, {})
+
+
+def _lock_tenant(connection, tenant_id: int):
+    """
+    Row-lock the tenant's totals, creating them if missing, until the
+    transaction ends. Without it a recount under READ COMMITTED could count
+    before a concurrent create commits and then overwrite that create's
+    increment with its older count.
+    """
+    stmt = _insert(connection)(CategoryStatsTotals).values(tenant_id=tenant_id, total=0, live=0)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[CategoryStatsTotals.tenant_id], set_={"total": CategoryStatsTotals.total},
+    ))
+
+
+def recount_tenant(connection, tenant_id: int):
+    """Rebuild one tenant's summaries from categories, in the caller's transaction."""
+    insert = _insert(connection)
+    # Before counting: waits for in-flight increments of the tenant to commit
+    # (each statement below then sees them) and holds off new ones until this commits
+    _lock_tenant(connection, tenant_id)
+    live = func.coalesce(func.sum(case((Category.deleted_at.is_(None), 1), else_=0)), 0)
+    creator = func.coalesce(Category.created_by, 0)
+    day = _day(connection, Category.created_at)
+
+    connection.execute(delete(CategoryStatsByCreator).where(CategoryStatsByCreator.tenant_id == tenant_id))
+    connection.execute(delete(CategoryStatsByDay).where(CategoryStatsByDay.tenant_id == tenant_id))
+    connection.execute(insert(CategoryStatsByCreator).from_select(
+        ["tenant_id", "created_by", "total", "live"],
+        select(literal(tenant_id), creator, func.count(), live)
+        .where(Category.tenant_id == tenant_id).group_by(creator),
+    ))
+    connection.execute(insert(CategoryStatsByDay).from_select(
+        ["tenant_id", "day", "created"],
+        select(literal(tenant_id), day, func.count()).where(Category.tenant_id == tenant_id).group_by(day),
+    ))
+    stmt = insert(CategoryStatsTotals).from_select(
+        ["tenant_id", "total", "live", "refreshed_at"],
+        select(literal(tenant_id), func.count(), live, literal(datetime.now(timezone.utc)))
+        .where(Category.tenant_id == tenant_id),
+    )
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[CategoryStatsTotals.tenant_id],
+        set_={"total": stmt.excluded.total, "live": stmt.excluded.live, "refreshed_at": stmt.excluded.refreshed_at},
+    ))
+
+
+def _known_tenants(connection) -> Set[int]:
+    return set(connection.scalars(union(
+        select(Category.tenant_id).distinct(), select(CategoryStatsTotals.tenant_id)
+    )))
+
+
+def refresh_all(bind=engine) -> int:
+    """Recount every tenant, one transaction each; returns the number of tenants."""
+    with bind.connect() as connection:
+        tenants = _known_tenants(connection)
+    for tenant_id in sorted(tenants):
+        with bind.begin() as connection:
+            recount_tenant(connection, tenant_id)
+    return len(tenants)
+
+
+# ---------------- Incremental maintenance ----------------
+
+def _recounts(session) -> Set[Optional[int]]:
+    return session.info.setdefault("category_stats_recount", set())
+
+
+def _tenant(state, session) -> int:
+    tenant_id = state.dict.get("tenant_id", session.info.get("tenant_id"))
+    return DEFAULT_TENANT_ID if tenant_id is None else tenant_id
+
+
+def _count_flush(session, flush_context):
+    totals, creators, days = {}, {}, {}
+    recount = set()
+    today = datetime.now(timezone.utc).date()
+    for obj in session.new:
+        if not isinstance(obj, Category):
+            continue
+        state = inspect(obj)
+        tenant_id = _tenant(state, session)
+        live = 1 if state.dict.get("deleted_at") is None else 0
+        created_at = state.dict.get("created_at")
+        # created_at comes from the server default, which is "now"
+        day = created_at.astimezone(timezone.utc).date() if isinstance(created_at, datetime) else today
+        for counts, key in ((totals, tenant_id), (creators, (tenant_id, state.dict.get("created_by") or 0))):
+            total_live = counts.setdefault(key, [0, 0])
+            total_live[0] += 1
+            total_live[1] += live
+        days[tenant_id, day] = days.get((tenant_id, day), 0) + 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Category):
+            state = inspect(obj)
+            if any(state.attrs[column].history.has_changes() for column in COUNTED_COLUMNS):
+                recount.add(_tenant(state, session))
+    for obj in session.deleted:
+        if isinstance(obj, Category):
+            recount.add(_tenant(inspect(obj), session))
+
+    if not (totals or recount):
+        return
+    connection = session.connection()
+    _add(connection, totals, creators, days)
+    # The flushed rows are visible to this transaction already
+    for tenant_id in sorted(recount):
+        recount_tenant(connection, tenant_id)
+
+
+def _mark_bulk(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Category:
+        return
+    if not orm_execute_state.execution_options.get("category_stats", True):
+        return
+    _recounts(orm_execute_state.session).add(orm_execute_state.session.info.get("tenant_id", ALL_TENANTS))
+
+
+def _recount_before_commit(session):
+    tenants = session.info.pop("category_stats_recount", None)
+    if not tenants:
+        return
+    connection = session.connection()
+    if ALL_TENANTS in tenants:
+        tenants = _known_tenants(connection)
+    for tenant_id in sorted(tenants):
+        recount_tenant(connection, tenant_id)
+
+
+def _forget_recounts(session):
+    session.info.pop("category_stats_recount", None)
+
+
+if CATEGORY_STATS_INCREMENTAL:
+    event.listen(Session, "after_flush", _count_flush)
+    event.listen(Session, "do_orm_execute", _mark_bulk)
+    # Ahead of change_feed's commit stamp, which holds the change clock until COMMIT
+    event.listen(Session, "before_commit", _recount_before_commit, insert=True)
+    event.listen(Session, "after_rollback", _forget_recounts)
+
+
+# ---------------- Scheduled refresh ----------------
+
+class StatsRefresher:
+    """Background thread that recounts every tenant every interval seconds."""
+
+    def __init__(self, interval: float = CATEGORY_STATS_REFRESH_SECONDS, bind=engine):
+        self.interval = interval
+        self.bind = bind
+        self.last_refresh: Optional[datetime] = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self.metrics = {"refreshes": 0, "tenants": 0, "errors": 0}
+
+    def refresh(self) -> int:
+        tenants = refresh_all(self.bind)
+        self.last_refresh = datetime.now(timezone.utc)
+        self.metrics["refreshes"] += 1
+        self.metrics["tenants"] = tenants
+        return tenants
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.metrics["errors"] += 1
+                print(f"❌ Category stats refresh failed: {e}")
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="category-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {**self.metrics, "interval": self.interval, "incremental": CATEGORY_STATS_INCREMENTAL,
+                "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None}
+
+
+stats_refresher = StatsRefresher()
+
+
+# ---------------- Reads ----------------
+
+def read_stats(db: Session, tenant_id: int, days: int = 30, top: int = 100) -> dict:
+    """Totals, the top creators by live categories and the last `days` days, from the summaries only."""
+    totals = db.execute(
+        select(CategoryStatsTotals.total, CategoryStatsTotals.live, CategoryStatsTotals.refreshed_at)
+        .where(CategoryStatsTotals.tenant_id == tenant_id)
+    ).first()
+    creators = db.execute(
+        select(CategoryStatsByCreator.created_by, CategoryStatsByCreator.total, CategoryStatsByCreator.live)
+        .where(CategoryStatsByCreator.tenant_id == tenant_id)
+        .order_by(CategoryStatsByCreator.live.desc(), CategoryStatsByCreator.created_by)
+        .limit(top)
+    ).all()
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    per_day = db.execute(
+        select(CategoryStatsByDay.day, CategoryStatsByDay.created)
+        .where(CategoryStatsByDay.tenant_id == tenant_id, CategoryStatsByDay.day >= since)
+        .order_by(CategoryStatsByDay.day)
+    ).all()
+
+    total, live, refreshed_at = totals if totals is not None else (0, 0, None)
+    # Incremental summaries commit together with the categories themselves,
+    # so read from the primary (see get_category_stats) they are exact
+    staleness = 0.0 if CATEGORY_STATS_INCREMENTAL else CATEGORY_STATS_REFRESH_SECONDS
+    return {
+        "total": total,
+        "live": live,
+        "deleted": total - live,
+        "by_creator": [{"created_by": created_by or None, "total": creator_total, "live": creator_live}
+                       for created_by, creator_total, creator_live in creators],
+        "by_day": [{"day": day if isinstance(day, date) else date.fromisoformat(day), "created": created}
+                   for day, created in per_day],
+        "refreshed_at": refreshed_at,
+        "staleness_bound_seconds": staleness,
+        "maintenance": "incremental" if CATEGORY_STATS_INCREMENTAL else "scheduled",
+    }
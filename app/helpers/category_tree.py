@@ -0,0 +1,114 @@
+"""
+Materialized-path operations on the category tree.
+
+Every category stores the ids from the root down to itself in ``path``
+("/1/5/12/"), so each read below is a single indexed query and moving a
+subtree is one set-based UPDATE, whatever the depth.
+"""
+from collections import Counter
+from typing import List, Optional
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.helpers import category_stats
+from app.models.category import Category
+
+
+class TreeError(ValueError):
+    """Raised for moves that would break the tree."""
+
+
+def path_for(category_id: int, parent: Optional[Category]) -> str:
+    return f"{parent.path if parent else '/'}{category_id}/"
+
+
+def place(db: Session, category: Category, parent: Optional[Category] = None):
+    """Set path/depth of a new category; flushes to obtain its id."""
+    category.parent_id = parent.id if parent else None
+    db.flush()
+    category.path = path_for(category.id, parent)
+    category.depth = parent.depth + 1 if parent else 0
+
+
+def children(db: Session, category: Category) -> List[Category]:
+    stmt = (
+        select(Category)
+        .where(Category.parent_id == category.id, Category.deleted_at.is_(None))
+        .order_by(Category.id)
+    )
+    return list(db.scalars(stmt))
+
+
+def subtree(db: Session, category: Category, max_depth: Optional[int] = None, limit: Optional[int] = None) -> List[Category]:
+    """The category and all its descendants, parents before children."""
+    stmt = select(Category).where(Category.path.like(category.path + "%"), Category.deleted_at.is_(None))
+    if max_depth is not None:
+        stmt = stmt.where(Category.depth <= category.depth + max_depth)
+    stmt = stmt.order_by(Category.path)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(db.scalars(stmt))
+
+
+def ancestor_ids(category: Category) -> List[int]:
+    return [int(part) for part in category.path.strip("/").split("/")[:-1]]
+
+
+def ancestors(db: Session, category: Category) -> List[Category]:
+    """Breadcrumb from the root down to the category's parent."""
+    ids = ancestor_ids(category)
+    if not ids:
+        return []
+    stmt = select(Category).where(Category.id.in_(ids)).order_by(Category.depth)
+    return list(db.scalars(stmt))
+
+
+def move(db: Session, category: Category, new_parent: Optional[Category], user_id: Optional[int] = None) -> int:
+    """
+    Re-parent a category together with its whole subtree.
+
+    Returns the number of rows rewritten. The caller commits.
+    """
+    if new_parent is not None and new_parent.path.startswith(category.path):
+        raise TreeError("Cannot move a category under itself or one of its descendants")
+
+    old_prefix = category.path
+    new_prefix = path_for(category.id, new_parent)
+    depth_delta = (new_parent.depth + 1 if new_parent else 0) - category.depth
+
+    result = db.execute(
+        update(Category)
+        .where(Category.path.like(old_prefix + "%"))
+        .values(
+            path=literal(new_prefix) + func.substr(Category.path, len(old_prefix) + 1),
+            depth=Category.depth + depth_delta,
+            updated_by=user_id,
+        )
+        # Moves leave every count in app.helpers.category_stats alone
+        .execution_options(synchronize_session=False, category_stats=False)
+    )
+    db.execute(
+        update(Category)
+        .where(Category.id == category.id)
+        .values(parent_id=new_parent.id if new_parent else None, updated_by=user_id)
+        .execution_options(synchronize_session=False, category_stats=False)
+    )
+    db.expire_all()
+    return result.rowcount
+
+
+def soft_delete(db: Session, category: Category, user_id: Optional[int] = None) -> int:
+    """Mark a category and its subtree deleted. The caller commits."""
+    creators = Counter(db.scalars(
+        update(Category)
+        .where(Category.path.like(category.path + "%"), Category.deleted_at.is_(None))
+        .values(deleted_at=func.now(), deleted_by=user_id, updated_by=user_id)
+        .returning(Category.created_by)
+        .execution_options(synchronize_session=False, category_stats=False)
+    ).all())
+    category_stats.count_deleted(db, category.tenant_id, {
+        created_by or 0: count for created_by, count in creators.items()
+    })
+    db.expire_all()
+    return sum(creators.values())
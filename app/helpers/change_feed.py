@@ -0,0 +1,153 @@
+"""
+Incremental sync for categories.
+
+Every transaction that writes categories stamps the rows it touched with
+a change_seq as it commits. The value comes from incrementing the
+tenant's category_change_clock row, whose lock is held until COMMIT, so a
+tenant's stamps become visible in the order they were handed out: once a
+reader sees change_seq N, every smaller stamp of that tenant is already
+committed. Until then the rows carry change_seq NULL (Category.change_seq's
+onupdate), which only their own transaction can see. Each tenant has its
+own clock, so writers of different tenants never wait for each other.
+
+A change token is the (change_seq, id) of the last row a client has
+seen; rows come back in that order through the
+ix_categories_tenant_id_change_seq_id index, and nothing can commit
+behind a token that was handed out. The sequence is per tenant, so the
+feed must be read through a tenant-scoped session, and from the primary,
+since a lagging replica would hide rows behind newer ones.
+"""
+import asyncio
+import base64
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.category import Category, CategoryChangeClock
+
+# Long-poll/SSE clients re-query at least this often to see other workers' writes
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))
+
+
+def encode_token(change_seq: int, category_id: int) -> str:
+    raw = f"{change_seq}|{category_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Tuple[int, int]:
+    """Raises ValueError for anything that is not a token we issued."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        change_seq, category_id = raw.rsplit("|", 1)
+        return int(change_seq), int(category_id)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid change token") from e
+
+
+def fetch_changes(db: Session, since: Optional[str], limit: int) -> Tuple[List[Category], Optional[str], bool]:
+    """Return (rows, next_token, has_more) for changes after the token."""
+    stmt = select(Category).where(Category.change_seq.is_not(None))
+    if since:
+        change_seq, category_id = decode_token(since)
+        stmt = stmt.where(tuple_(Category.change_seq, Category.id) > tuple_(change_seq, category_id))
+    stmt = stmt.order_by(Category.change_seq, Category.id).limit(limit + 1)
+
+    rows = list(db.scalars(stmt))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_token = encode_token(rows[-1].change_seq, rows[-1].id) if rows else since
+    return rows, next_token, has_more
+
+
+# In-process change counter so waiting clients wake up right after a commit
+_version = 0
+_version_lock = threading.Lock()
+
+
+def change_version() -> int:
+    return _version
+
+
+# A write whose tenant is not known (set-based statement of an unscoped
+# session): the stamp looks up which tenants have unstamped rows
+ALL_TENANTS = None
+
+
+def _changed_tenants(session) -> set:
+    return session.info.setdefault("categories_changed", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Category):
+            _changed_tenants(session).add(inspect(obj).dict.get("tenant_id", session.info.get("tenant_id")))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Category:
+            session = orm_execute_state.session
+            _changed_tenants(session).add(session.info.get("tenant_id", ALL_TENANTS))
+
+
+def _next_change_seq(connection, tenant_id: int) -> int:
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    clock = CategoryChangeClock.__table__
+    stmt = insert(clock).values(tenant_id=tenant_id, value=1)
+    return connection.execute(
+        stmt.on_conflict_do_update(index_elements=[clock.c.tenant_id], set_={"value": clock.c.value + 1})
+        .returning(clock.c.value)
+    ).scalar_one()
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_changes(session):
+    # Registered last on purpose (see category_stats): from the first clock
+    # update on, this transaction only touches its own rows until COMMIT
+    session.flush()
+    tenants = session.info.get("categories_changed")
+    if not tenants:
+        return
+    connection = session.connection()
+    categories = Category.__table__
+    if ALL_TENANTS in tenants:
+        tenants = connection.scalars(
+            select(categories.c.tenant_id).where(categories.c.change_seq.is_(None)).distinct()
+        ).all()
+    # Tenant order, so two multi-tenant transactions take the clocks in the same order
+    for tenant_id in sorted(tenants):
+        change_seq = _next_change_seq(connection, tenant_id)
+        connection.execute(
+            update(categories)
+            .where(categories.c.change_seq.is_(None), categories.c.tenant_id == tenant_id)
+            # Explicit, so the stamp does not count as another update
+            .values(change_seq=change_seq, updated_at=categories.c.updated_at)
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_version(session):
+    global _version
+    if session.info.pop("categories_changed", False):
+        with _version_lock:
+            _version += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop("categories_changed", None)
+
+
+async def wait_for_change(version: int, timeout: float):
+    """Sleep until a local commit touched categories or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while _version == version and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
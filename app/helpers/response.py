@@ -1,5 +1,7 @@
 from typing import Any, Dict, Optional
 
+from fastapi.responses import JSONResponse
+
 
 def response(success: bool, code: int, message: str, data: Any = None, pagination: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     return {
@@ -19,6 +21,11 @@ def error_response(message: str, code: int = 400, data: Any = None) -> Dict[str,
     return response(success=False, code=code, message=message, data=data)
 
 
+def error_json_response(message: str, code: int = 400, data: Any = None) -> JSONResponse:
+    # Returned as a Response so it bypasses the route's typed response_model
+    return JSONResponse(content=error_response(message=message, code=code, data=data))
+
+
 def paginated_response(data: Any, total: int, page: int, per_page: int, message: str = "Success") -> Dict[str, Any]:
     total_pages = (total + per_page - 1) // per_page  # Ceiling division
 
@@ -0,0 +1,89 @@
+"""
+Tenant scoping.
+
+A session carries the tenant of the authenticated user in
+``session.info["tenant_id"]``. Every ORM SELECT, UPDATE and DELETE it runs
+against a tenant-scoped model then gets ``tenant_id = :tenant`` added, and
+new rows are stamped with the tenant on flush, so routers never filter by
+hand.
+
+Scoping fails closed: a session without a tenant that touches a
+tenant-scoped model raises TenantScopeError. Background paths that work
+across tenants on purpose (the coalesced id loader, which matches on
+(tenant_id, id) itself) mark their session with ``unscoped()``. Sessions
+that never touch tenant data (auth lookups, the task queue) need neither.
+"""
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.models.audit import AuditLog
+from app.models.category import Category
+
+DEFAULT_TENANT_ID = 0
+
+TENANT_SCOPED = (Category, AuditLog)
+
+
+class TenantScopeError(Exception):
+    """Raised when a session with no tenant, not marked unscoped(), touches tenant data."""
+
+
+def tenant_of(user) -> int:
+    tenant_id = getattr(user, "tenant_id", None)
+    return DEFAULT_TENANT_ID if tenant_id is None else tenant_id
+
+
+def set_tenant(db: Session, tenant_id: Optional[int]) -> Session:
+    db.info["tenant_id"] = tenant_id
+    return db
+
+
+def unscoped(db: Session) -> Session:
+    """Let a session without a tenant read and write every tenant's rows."""
+    db.info["tenant_id"] = None
+    db.info["all_tenants"] = True
+    return db
+
+
+def current_tenant(db: Session) -> Optional[int]:
+    return db.info.get("tenant_id")
+
+
+def _check_unscoped(session, models):
+    if session.info.get("all_tenants"):
+        return
+    scoped = sorted({model.__name__ for model in models if issubclass(model, TENANT_SCOPED)})
+    if scoped:
+        raise TenantScopeError(f"Session has no tenant for {', '.join(scoped)}")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_tenant(orm_execute_state):
+    tenant_id = orm_execute_state.session.info.get("tenant_id")
+    if orm_execute_state.is_select:
+        if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+            return
+    elif not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    if tenant_id is None:
+        _check_unscoped(orm_execute_state.session, [mapper.class_ for mapper in orm_execute_state.all_mappers])
+        return
+    if orm_execute_state.is_insert:
+        return
+    orm_execute_state.statement = orm_execute_state.statement.options(*(
+        with_loader_criteria(model, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+        for model in TENANT_SCOPED
+    ))
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_tenant(session, flush_context, instances):
+    tenant_id = session.info.get("tenant_id")
+    if tenant_id is None:
+        _check_unscoped(session, [type(obj) for obj in (*session.new, *session.dirty, *session.deleted)])
+        return
+    for obj in session.new:
+        if isinstance(obj, TENANT_SCOPED) and obj.tenant_id is None:
+            obj.tenant_id = tenant_id
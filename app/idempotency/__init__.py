@@ -0,0 +1,5 @@
+# Idempotency-Key support: the first response to a key is stored and replayed to retries
+from .stores import (DatabaseStore, IdempotencyStore, MemoryStore, StoredResponse,
+                     idempotency_store)
+
+__all__ = ['idempotency_store', 'IdempotencyStore', 'MemoryStore', 'DatabaseStore', 'StoredResponse']
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import engine
+from app.models.idempotency import IdempotencyKey
+
+# memory (per process) or database (shared by all workers)
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory")
+IDEMPOTENCY_MEMORY_KEYS = int(os.getenv("IDEMPOTENCY_MEMORY_KEYS", "10000"))
+# How often expired keys are deleted
+IDEMPOTENCY_GC_SECONDS = float(os.getenv("IDEMPOTENCY_GC_SECONDS", "60"))
+
+
+class StoredResponse:
+    """What a store holds for one key: the request fingerprint and, once done, the response."""
+
+    __slots__ = ("fingerprint", "state", "status_code", "headers", "body", "expires_at")
+
+    def __init__(self, fingerprint: str, state: str, status_code: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None, body: Optional[bytes] = None, expires_at: float = 0.0):
+        self.fingerprint = fingerprint
+        self.state = state  # in_flight | done
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+
+class IdempotencyStore(ABC):
+    """
+    Where claimed keys and stored responses live. Subclasses implement the
+    key operations; this base runs the thread that deletes expired keys
+    every gc_seconds.
+    """
+
+    # True when the operations do I/O and must run off the event loop
+    blocking = False
+
+    def __init__(self, gc_seconds: float):
+        self.gc_seconds = gc_seconds
+        self._thread = None
+        self._stopping = threading.Event()
+        self.metrics = {"claimed": 0, "replayed": 0, "waited": 0, "conflicts": 0, "mismatched": 0,
+                        "completed": 0, "released": 0, "purged": 0}
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[StoredResponse]:
+        """Claim the key and return None, or return what is already stored for it."""
+
+    @abstractmethod
+    def complete(self, key: str, status_code: int, headers: Dict[str, str], body: bytes, ttl: float):
+        """Store the response of the request that claimed the key."""
+
+    @abstractmethod
+    def release(self, key: str):
+        """Give up a claim without storing anything, so a retry runs for real."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired keys and return how many."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Metrics plus backend details for /_admin/idempotency."""
+
+    def _run(self):
+        while not self._stopping.wait(self.gc_seconds):
+            try:
+                self.metrics["purged"] += self.purge_expired()
+            except Exception as e:
+                print(f"❌ Idempotency key cleanup failed: {e}")
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="idempotency-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class MemoryStore(IdempotencyStore):
+    """
+    Keys of this process only: duplicates are recognized when they reach
+    the same worker. Beyond maxsize the oldest entries are evicted.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = IDEMPOTENCY_MEMORY_KEYS, gc_seconds: float = IDEMPOTENCY_GC_SECONDS):
+        self.maxsize = maxsize
+        self._entries: Dict[str, StoredResponse] = {}
+        self._lock = threading.Lock()
+        super().__init__(gc_seconds)
+
+    def begin(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[StoredResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                return entry
+            if len(self._entries) >= self.maxsize:
+                self._purge(now)
+                while len(self._entries) >= self.maxsize:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries.pop(key, None)
+            self._entries[key] = StoredResponse(fingerprint, "in_flight", expires_at=now + lease_seconds)
+        self.metrics["claimed"] += 1
+        return None
+
+    def complete(self, key: str, status_code: int, headers: Dict[str, str], body: bytes, ttl: float):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = StoredResponse(entry.fingerprint, "done", status_code, headers, body,
+                                                    time.time() + ttl)
+        self.metrics["completed"] += 1
+
+    def release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.state == "in_flight":
+                del self._entries[key]
+        self.metrics["released"] += 1
+
+    def _purge(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge(time.time())
+
+    def stats(self) -> dict:
+        return {**self.metrics, "backend": "memory", "keys": len(self._entries), "maxsize": self.maxsize}
+
+
+class DatabaseStore(IdempotencyStore):
+    """
+    Keys in the idempotency_keys table, shared by every worker. A claim is
+    one INSERT .. ON CONFLICT DO NOTHING, so two workers can never both
+    run the same request.
+    """
+
+    blocking = True
+
+    def __init__(self, bind=engine, gc_seconds: float = IDEMPOTENCY_GC_SECONDS, gc_batch_size: int = 5000):
+        self.bind = bind
+        self.gc_batch_size = gc_batch_size
+        super().__init__(gc_seconds)
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def begin(self, key: str, fingerprint: str, lease_seconds: float) -> Optional[StoredResponse]:
+        now = self._now()
+        claim = {"fingerprint": fingerprint, "state": "in_flight", "status_code": None, "headers": None,
+                 "body": None, "expires_at": now + timedelta(seconds=lease_seconds)}
+        with self.bind.begin() as connection:
+            insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+            # The row can vanish to the sweeper between the statements; then just try again
+            for _ in range(3):
+                inserted = connection.execute(
+                    insert(IdempotencyKey).values(key=key, **claim).on_conflict_do_nothing(index_elements=["key"])
+                )
+                if inserted.rowcount:
+                    break
+                # Take over a key past its TTL, or whose original request died holding the lease
+                taken = connection.execute(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+                    .values(**claim)
+                )
+                if taken.rowcount:
+                    break
+                row = connection.execute(
+                    select(IdempotencyKey.fingerprint, IdempotencyKey.state, IdempotencyKey.status_code,
+                           IdempotencyKey.headers, IdempotencyKey.body)
+                    .where(IdempotencyKey.key == key)
+                ).first()
+                if row is not None:
+                    return StoredResponse(row.fingerprint, row.state, row.status_code,
+                                          json.loads(row.headers) if row.headers else None, row.body)
+            else:
+                raise RuntimeError(f"Could not claim idempotency key {key}")
+        self.metrics["claimed"] += 1
+        return None
+
+    def complete(self, key: str, status_code: int, headers: Dict[str, str], body: bytes, ttl: float):
+        with self.bind.begin() as connection:
+            connection.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(state="done", status_code=status_code, headers=json.dumps(headers), body=body,
+                        expires_at=self._now() + timedelta(seconds=ttl))
+            )
+        self.metrics["completed"] += 1
+
+    def release(self, key: str):
+        with self.bind.begin() as connection:
+            connection.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.state == "in_flight")
+            )
+        self.metrics["released"] += 1
+
+    def purge_expired(self) -> int:
+        """Delete expired keys in batches, so no single statement holds locks for long."""
+        purged = 0
+        while True:
+            doomed = (
+                select(IdempotencyKey.key)
+                .where(IdempotencyKey.expires_at <= self._now())
+                .limit(self.gc_batch_size)
+            )
+            with self.bind.begin() as connection:
+                deleted = connection.execute(delete(IdempotencyKey).where(IdempotencyKey.key.in_(doomed))).rowcount
+            purged += deleted
+            if deleted < self.gc_batch_size:
+                return purged
+
+    def stats(self) -> dict:
+        return {**self.metrics, "backend": "database", "gc_batch_size": self.gc_batch_size}
+
+
+def _store_from_env():
+    if IDEMPOTENCY_BACKEND == "database":
+        return DatabaseStore(gc_seconds=IDEMPOTENCY_GC_SECONDS)
+    return MemoryStore(maxsize=IDEMPOTENCY_MEMORY_KEYS, gc_seconds=IDEMPOTENCY_GC_SECONDS)
+
+
+idempotency_store = _store_from_env()
@@ -1,18 +1,85 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from sqlalchemy import text
 
-from app.database import Base, engine
+from app.audit import audit_writer
+from app.database import dispose_engines, engine
+from app.helpers.category_stats import stats_refresher
+from app.idempotency import idempotency_store
+from app.middleware.admission import ADMISSION_ENABLED, admission_middleware
 from app.middleware.auth import auth_middleware
-from app.routers import auth, category
+from app.middleware.deadline import DEADLINES_ENABLED, deadline_middleware
+from app.middleware.idempotency import IDEMPOTENCY_ENABLED, idempotency_middleware
+from app.middleware.profiling import PROFILING_ENABLED, profiling_middleware
+from app.middleware.query_stats import query_stats_middleware
+from app.routers import admin, audit, auth, category
+from app.routers.admin import ADMIN_ENABLED
+from app.schema_check import check_at_startup
+from app.tasks import jobs, task_queue  # noqa: F401  (jobs registers the tasks)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker after the fork, so connections are never shared
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        print("DB connected!")
+    except Exception as e:
+        print("DB connection failed:", e)
+    else:
+        # The schema comes from Alembic (or python -m app.schema_check --init)
+        check_at_startup()
+
+    task_queue.start()
+    audit_writer.start()
+    idempotency_store.start()
+    stats_refresher.start()
+
+    yield
+
+    # In-flight requests have drained by now; finish queued work and buffered
+    # audit records, then close pooled connections
+    stats_refresher.stop()
+    idempotency_store.stop()
+    task_queue.stop()
+    audit_writer.stop()
+    dispose_engines()
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Product Category API")
+app = FastAPI(title="Product Category API", lifespan=lifespan)
 
 # Public routes
 app.include_router(auth.router)
 
 # Protected routes
 app.include_router(category.router)
+app.include_router(audit.router)
+
+# Opt-in admin counters, additionally guarded by the X-Admin-Token header
+if ADMIN_ENABLED:
+    app.include_router(admin.router)
+
+# Innermost, so replays are keyed by the authenticated user
+if IDEMPOTENCY_ENABLED:
+    app.middleware("http")(idempotency_middleware)
 
 # Middleware applied to all routes
 app.middleware("http")(auth_middleware)
+
+# Opt-in profiling; nothing is installed when disabled
+if PROFILING_ENABLED:
+    app.include_router(admin.profiling_router)
+    app.middleware("http")(profiling_middleware)
+
+# Counts the auth lookup too
+app.middleware("http")(query_stats_middleware)
+
+# The auth lookup runs under the deadline as well
+if DEADLINES_ENABLED:
+    app.middleware("http")(deadline_middleware)
+
+# Outermost: a request turned away under overload costs no DB work at all
+if ADMISSION_ENABLED:
+    app.middleware("http")(admission_middleware)
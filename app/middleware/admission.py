@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.helpers.response import error_response
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+# Per route group "name=limit" or "name=limit:queue"; queue defaults to 2 x limit
+ADMISSION_LIMITS = os.getenv("ADMISSION_LIMITS", "auth=16,category_read=64,category_write=16")
+# How long a request may wait for a slot before it gets a 503
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+# Adapt each limit to latency: grow while requests stay fast, shrink when they slow down
+ADMISSION_ADAPTIVE = os.getenv("ADMISSION_ADAPTIVE", "0") == "1"
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+# A request slower than this multiple of the fastest recent one counts as congestion
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2"))
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` requests in flight, at most `queue_size` waiting.
+
+    Runs on the event loop, so no locking is needed. With adaptive=True the
+    limit follows AIMD: +1/limit for every fast request, x0.9 (at most once
+    per fastest latency) for a slow one, between min_limit and max_limit.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, adaptive: bool = False,
+                 min_limit: int = ADMISSION_MIN_LIMIT, tolerance: float = ADMISSION_LATENCY_TOLERANCE):
+        self.name = name
+        self.max_limit = limit
+        self.limit = float(limit)
+        self.queue_size = queue_size
+        self.adaptive = adaptive
+        self.min_limit = min(min_limit, limit)
+        self.tolerance = tolerance
+        self.inflight = 0
+        self._waiters = deque()
+        self._min_latency: Optional[float] = None
+        self._min_latency_at = 0.0
+        self._last_decrease = 0.0
+        self.metrics = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self.metrics["admitted"] += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.metrics["rejected"] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.metrics["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                self.metrics["timed_out"] += 1
+                return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was already handed over
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        self.metrics["admitted"] += 1
+        return True
+
+    def release(self, latency: Optional[float] = None):
+        self.inflight -= 1
+        if latency is not None and self.adaptive:
+            self._adapt(latency)
+        # Hand free slots straight to the oldest waiters
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(True)
+
+    def _adapt(self, latency: float):
+        now = time.monotonic()
+        # Forget the baseline every minute so it can follow slower steady states
+        if self._min_latency is None or latency < self._min_latency or now - self._min_latency_at > 60:
+            self._min_latency, self._min_latency_at = latency, now
+        if latency > self._min_latency * self.tolerance:
+            if now - self._last_decrease >= self._min_latency:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+                self._last_decrease = now
+        elif self.inflight + 1 >= int(self.limit):
+            # Only grow while the limit is actually what holds requests back
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        return {**self.metrics, "limit": int(self.limit), "max_limit": self.max_limit,
+                "inflight": self.inflight, "waiting": len(self._waiters),
+                "min_latency_ms": round(self._min_latency * 1000, 2) if self._min_latency else None}
+
+
+def _parse_limits(spec: str) -> Dict[str, ConcurrencyLimiter]:
+    limiters = {}
+    for entry in spec.split(","):
+        name, _, value = entry.strip().partition("=")
+        if not name or not value:
+            continue
+        limit, _, queue_size = value.partition(":")
+        limit = int(limit)
+        limiters[name] = ConcurrencyLimiter(
+            name, limit, int(queue_size) if queue_size else 2 * limit, adaptive=ADMISSION_ADAPTIVE
+        )
+    return limiters
+
+
+limiters = _parse_limits(ADMISSION_LIMITS)
+
+
+def route_group(request: Request) -> Optional[str]:
+    """Route group of a request; None is never limited."""
+    path = request.url.path
+    if path in ("/login", "/register"):
+        return "auth"
+    if path.startswith("/categories"):
+        # Long-polls and streams park for up to a minute without working the DB
+        if path.startswith("/categories/changes"):
+            return None
+        return "category_read" if request.method in ("GET", "HEAD") else "category_write"
+    return None
+
+
+async def admission_middleware(request: Request, call_next):
+    """
+    Bounds concurrent requests per route group so an overloaded database
+    queues work here, cheaply, instead of in every worker's session pool.
+    """
+    limiter = limiters.get(route_group(request))
+    if limiter is None:
+        return await call_next(request)
+
+    if not await limiter.acquire(ADMISSION_QUEUE_TIMEOUT):
+        return JSONResponse(
+            status_code=503,
+            content=error_response(message="Server busy, retry shortly", code=503),
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+        )
+
+    start = time.perf_counter()
+    latency = None
+    try:
+        response = await call_next(request)
+        latency = time.perf_counter() - start
+        return response
+    finally:
+        # A streamed body is sent after this point and no longer holds a slot
+        limiter.release(latency)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.auth.auth import decode_access_token
 from app.database import SessionLocal, get_db
 from app.models.user import User
+from app.queries import get_user_by_id
 
 
 async def auth_middleware(request: Request, call_next):
@@ -41,7 +42,7 @@ async def auth_middleware(request: Request, call_next):
 
         # Get user from database
         db = SessionLocal()
-        user = db.query(User).filter(User.id == user_id).first()
+        user = get_user_by_id(db, user_id)
         
         if not user:
             return JSONResponse(
@@ -84,7 +85,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        user = db.query(User).filter(User.id == user_id).first()
+        user = get_user_by_id(db, user_id)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
         
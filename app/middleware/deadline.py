@@ -0,0 +1,223 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.helpers.response import error_response
+from app.middleware.admission import route_group
+
+DEADLINES_ENABLED = os.getenv("DEADLINES_ENABLED", "1") == "1"
+# Per route group "name=milliseconds"; requests outside these groups are not bounded
+QUERY_DEADLINES = os.getenv("QUERY_DEADLINES", "auth=5000,category_read=3000,category_write=10000")
+# Bulk and long-lived endpoints pace themselves and run past any request deadline
+UNBOUNDED_PATHS = ("/categories/changes", "/categories/export", "/categories/import")
+# SQLite has no statement_timeout; it checks the deadline every this many VM steps
+SQLITE_PROGRESS_STEPS = 10000
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a statement once the request's deadline has passed."""
+
+
+class Deadline:
+    """Time left for one request's queries, and a handle to cancel the running one."""
+
+    def __init__(self, milliseconds: float):
+        self.milliseconds = milliseconds
+        self.expires_at = time.monotonic() + milliseconds / 1000
+        self.cancelled = False
+        self._active = None  # DBAPI connection currently executing a statement
+        self._lock = threading.Lock()
+
+    def remaining_ms(self) -> int:
+        return int((self.expires_at - time.monotonic()) * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() >= self.expires_at
+
+    def started(self, dbapi_connection):
+        with self._lock:
+            self._active = dbapi_connection
+
+    def finished(self):
+        with self._lock:
+            self._active = None
+
+    def cancel(self):
+        """Stop waiting on the database: interrupt the running statement, refuse new ones."""
+        with self._lock:
+            self.cancelled = True
+            connection = self._active
+        if connection is None:
+            return
+        # psycopg/psycopg2 send a cancel request to the server; sqlite3 interrupts in-process
+        interrupt = getattr(connection, "cancel", None) or getattr(connection, "interrupt", None)
+        try:
+            interrupt()
+        except Exception as e:
+            print(f"⚠️ Could not cancel query: {e}")
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("query_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def longest_deadline(deadlines: Iterable[Optional[Deadline]]) -> Optional[Deadline]:
+    """
+    A new Deadline for work shared by several requests: it lasts as long as
+    the longest of theirs, and none of their disconnects cancels it. None
+    (unbounded) if any of them is unbounded.
+    """
+    deadlines = list(deadlines)
+    if not deadlines or any(deadline is None for deadline in deadlines):
+        return None
+    expires_at = max(deadline.expires_at for deadline in deadlines)
+    return Deadline(max(expires_at - time.monotonic(), 0) * 1000)
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]):
+    """Bound the queries of the block by `deadline` (None: unbounded) instead of the current one."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def _parse_deadlines(spec: str) -> Dict[str, float]:
+    deadlines = {}
+    for entry in spec.split(","):
+        name, _, value = entry.strip().partition("=")
+        if name and value:
+            deadlines[name] = float(value)
+    return deadlines
+
+
+deadlines = _parse_deadlines(QUERY_DEADLINES)
+
+
+def deadline_for(request: Request) -> Optional[float]:
+    """Deadline in milliseconds for a request; None leaves it unbounded."""
+    if request.url.path.startswith(UNBOUNDED_PATHS):
+        return None
+    return deadlines.get(route_group(request))
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    deadline = _current_deadline.get()
+    if deadline is None or connection.dialect.name != "postgresql":
+        return
+    # Transaction scoped, so the pooled connection goes back without it
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(deadline.remaining_ms(), 1)}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _track_statement(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+    if deadline.expired:
+        raise DeadlineExceeded("Query deadline exceeded before the statement started")
+    deadline.started(cursor.connection)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _untrack_statement(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.finished()
+
+
+@event.listens_for(Engine, "handle_error")
+def _untrack_failed_statement(context):
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.finished()
+
+
+def _sqlite_progress() -> int:
+    # Runs on the executing thread, so it sees that request's deadline
+    deadline = _current_deadline.get()
+    return 1 if deadline is not None and deadline.expired else 0
+
+
+@event.listens_for(Engine, "connect")
+def _install_progress_handler(dbapi_connection, connection_record):
+    if hasattr(dbapi_connection, "set_progress_handler"):
+        dbapi_connection.set_progress_handler(_sqlite_progress, SQLITE_PROGRESS_STEPS)
+
+
+def is_query_cancelled(error: Exception) -> bool:
+    """True for a statement stopped by statement_timeout, a cancel request or an interrupt."""
+    if isinstance(error, DeadlineExceeded):
+        return True
+    if not isinstance(error, DBAPIError):
+        return False
+    orig = error.orig
+    # 57014 query_canceled: psycopg2 has pgcode, psycopg 3 sqlstate
+    if getattr(orig, "pgcode", None) == "57014" or getattr(orig, "sqlstate", None) == "57014":
+        return True
+    return "interrupted" in str(orig)
+
+
+async def _cancel_on_disconnect(request: Request, deadline: Deadline):
+    # The body is already cached, so the next message can only be the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            deadline.cancel()
+            return
+
+
+async def deadline_middleware(request: Request, call_next):
+    """
+    Bounds the time a request may spend in the database, per route group.
+
+    On Postgres every transaction gets SET LOCAL statement_timeout with the
+    time left; a GET whose client disconnects has its running query
+    cancelled. Either way the request ends with a 504 envelope and the
+    pooled connection is free again.
+    """
+    milliseconds = deadline_for(request)
+    if milliseconds is None:
+        return await call_next(request)
+
+    deadline = Deadline(milliseconds)
+    token = _current_deadline.set(deadline)
+    watcher = None
+    if request.method in ("GET", "HEAD"):
+        await request.body()
+        watcher = asyncio.ensure_future(_cancel_on_disconnect(request, deadline))
+    try:
+        return await call_next(request)
+    except Exception as e:
+        if not is_query_cancelled(e):
+            raise
+        if deadline.cancelled:
+            print(f"⚠️ Client went away, cancelled query of {request.method} {request.url.path}")
+            # Nobody is listening; 499 only shows up in logs
+            return Response(status_code=499)
+        return JSONResponse(
+            status_code=504,
+            content=error_response(message=f"Query deadline of {milliseconds:g} ms exceeded", code=504),
+        )
+    finally:
+        _current_deadline.reset(token)
+        if watcher is not None:
+            watcher.cancel()
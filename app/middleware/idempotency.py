@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import os
+import time
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+
+from app.helpers.response import error_response
+from app.idempotency import idempotency_store
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "1") == "1"
+# How long a completed response is replayed to retries
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# How long a duplicate waits for the in-flight original before it gets a 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# A claimed key whose request never finishes (crashed worker) is free again after this
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+# Larger responses are not stored, the key is released instead
+IDEMPOTENCY_MAX_BODY = int(os.getenv("IDEMPOTENCY_MAX_BODY", str(256 * 1024)))
+
+IDEMPOTENT_ROUTES = {("POST", "/categories"), ("POST", "/register")}
+
+
+async def _store(method, *args):
+    if idempotency_store.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+def _replay(stored) -> Response:
+    idempotency_store.metrics["replayed"] += 1
+    return Response(content=stored.body, status_code=stored.status_code,
+                    headers={**(stored.headers or {}), "Idempotent-Replayed": "true"})
+
+
+def _principal(request: Request):
+    """
+    Who a key belongs to. Runs after auth_middleware, so on protected routes
+    that is the user; anonymous callers (POST /register) are told apart by
+    their address, so two clients never share a stored response. Behind a
+    proxy, run the server with forwarded headers enabled.
+    """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return f"user:{user.id}"
+    if request.client is not None and request.client.host:
+        return f"addr:{request.client.host}"
+    return None  # no way to tell callers apart: no idempotency
+
+
+async def idempotency_middleware(request: Request, call_next):
+    """
+    Runs a POST sent with an Idempotency-Key header at most once per key:
+    retries get the stored response back without reaching the handler, and
+    a retry that overlaps the original waits for it. Keys are per caller
+    (see _principal) and route. 5xx responses are not stored, so those can
+    be retried for real.
+    """
+    key = request.headers.get("Idempotency-Key")
+    path = request.url.path.rstrip("/")
+    if key is None or (request.method, path) not in IDEMPOTENT_ROUTES:
+        return await call_next(request)
+    if not key or len(key) > 255:
+        return JSONResponse(status_code=400, content=error_response(
+            message="Idempotency-Key must be 1 to 255 characters", code=400))
+
+    principal = _principal(request)
+    if principal is None:
+        return await call_next(request)
+    scope = f"{principal}\n{request.method} {path}\n{key}"
+    scoped_key = hashlib.sha256(scope.encode()).hexdigest()
+    fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    waited = False
+    while True:
+        stored = await _store(idempotency_store.begin, scoped_key, fingerprint, IDEMPOTENCY_LEASE_SECONDS)
+        if stored is None:
+            break  # this request owns the key
+        if stored.fingerprint != fingerprint:
+            idempotency_store.metrics["mismatched"] += 1
+            return JSONResponse(status_code=422, content=error_response(
+                message="Idempotency-Key was already used with a different request body", code=422))
+        if stored.state == "done":
+            return _replay(stored)
+        if not waited:
+            idempotency_store.metrics["waited"] += 1
+            waited = True
+        if time.monotonic() >= deadline:
+            idempotency_store.metrics["conflicts"] += 1
+            return JSONResponse(
+                status_code=409,
+                content=error_response(message="A request with this Idempotency-Key is still in progress", code=409),
+                headers={"Retry-After": "1"},
+            )
+        # Polls so duplicates on other workers are seen too
+        await asyncio.sleep(0.05)
+
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        await _store(idempotency_store.release, scoped_key)
+        raise
+
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    if response.status_code >= 500 or len(body) > IDEMPOTENCY_MAX_BODY:
+        await _store(idempotency_store.release, scoped_key)
+    else:
+        await _store(idempotency_store.complete, scoped_key, response.status_code, headers, body,
+                     IDEMPOTENCY_TTL_SECONDS)
+    return Response(content=body, status_code=response.status_code, headers=headers)
@@ -0,0 +1,219 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.middleware.query_stats import add_server_timing
+
+# Nothing below is installed unless profiling is switched on at startup
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+PROFILING_HISTORY = int(os.getenv("PROFILING_HISTORY", "20"))
+
+# Leaf frames of threads that are parked rather than doing work
+IDLE_FUNCTIONS = {"wait", "_wait_for_tstate_lock", "select", "poll", "epoll", "get", "accept", "sleep"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Samples thread stacks from a background thread.
+
+    "wall" keeps every non-idle sample, "cpu" only keeps samples from threads
+    whose CPU clock advanced since the previous tick. With `threads`, only
+    the thread ids in that set are sampled (it may change while sampling);
+    without it, every thread is. The result is in the folded-stack format
+    understood by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, mode: str = "wall", interval: float = PROFILING_INTERVAL, threads: Optional[set] = None):
+        self.mode = mode if mode in ("wall", "cpu") else "wall"
+        self.interval = interval
+        self.threads = threads
+        self.samples = Counter()
+        self._cpu_times = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _on_cpu(self, thread_id: int) -> bool:
+        try:
+            clock = time.pthread_getcpuclockid(thread_id)
+            cpu_time = time.clock_gettime(clock)
+        except (AttributeError, OSError):
+            return True  # No per-thread CPU clocks on this platform: behave like wall mode
+        previous = self._cpu_times.get(thread_id)
+        self._cpu_times[thread_id] = cpu_time
+        return previous is not None and cpu_time > previous
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.threads is not None and thread_id not in self.threads):
+                    continue
+                if self.mode == "cpu":
+                    if not self._on_cpu(thread_id):
+                        continue
+                elif frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                self.samples[_fold(frame)] += 1
+
+    @staticmethod
+    def folded(samples: Counter) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
+
+
+# Per-request phase timings, only set while a request is being profiled
+_phases: ContextVar[Optional[dict]] = ContextVar("profile_phases", default=None)
+
+profiles = OrderedDict()
+
+
+def store_profile(samples: Counter) -> str:
+    profile_id = uuid.uuid4().hex
+    profiles[profile_id] = SamplingProfiler.folded(samples)
+    while len(profiles) > PROFILING_HISTORY:
+        profiles.popitem(last=False)
+    return profile_id
+
+
+def authorized(request: Request) -> bool:
+    return bool(PROFILING_TOKEN) and request.headers.get("X-Profile-Token") == PROFILING_TOKEN
+
+
+def _timed_endpoint(endpoint):
+    """Wrap an endpoint so the handler's own time is recorded while profiling."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            phases = _phases.get()
+            if phases is None:
+                return await endpoint(*args, **kwargs)
+            phases["handler_start"] = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                phases["handler_end"] = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            phases = _phases.get()
+            if phases is None:
+                return endpoint(*args, **kwargs)
+            # Sampled only while it runs this request's handler
+            thread_id = threading.get_ident()
+            phases["threads"].add(thread_id)
+            phases["handler_start"] = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                phases["handler_end"] = time.perf_counter()
+                phases["threads"].discard(thread_id)
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that splits a profiled request into dependency resolution,
+    handler and response serialization.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            phases = _phases.get()
+            if phases is None:
+                return await handler(request)
+            phases["route_start"] = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                phases["route_end"] = time.perf_counter()
+
+        return timed_handler
+
+
+# Routers pass this as route_class; plain APIRoute when profiling is off
+ProfiledRoute = TimedRoute if PROFILING_ENABLED else APIRoute
+
+
+def _server_timing(phases: dict, total: float) -> str:
+    entries = []
+    route = phases.get("route_end", 0) - phases.get("route_start", 0)
+    if "route_start" in phases:
+        entries.append(("middleware", total - route))
+    if "handler_start" in phases:
+        entries.append(("deps", phases["handler_start"] - phases["route_start"]))
+        entries.append(("handler", phases["handler_end"] - phases["handler_start"]))
+        entries.append(("serialize", phases["route_end"] - phases["handler_end"]))
+    entries.append(("total", total))
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in entries)
+
+
+async def profiling_middleware(request: Request, call_next):
+    """
+    Profile a single request when it carries "X-Profile: wall|cpu" and a valid
+    X-Profile-Token. The folded stacks are kept under the returned X-Profile-Id.
+
+    Only the threads serving the request are sampled: the event loop thread
+    and, while a sync handler runs, its threadpool worker. Other requests'
+    handlers on other workers stay out, but the event loop is shared, so
+    their async code can show up in its samples.
+    """
+    mode = request.headers.get("X-Profile")
+    if not mode:
+        return await call_next(request)
+    if not authorized(request):
+        return JSONResponse(status_code=403, content={"error": "Profiling not allowed"})
+
+    phases = {"threads": {threading.get_ident()}}
+    token = _phases.set(phases)
+    profiler = SamplingProfiler(mode, threads=phases["threads"]).start()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        total = time.perf_counter() - start
+        samples = profiler.stop()
+        _phases.reset(token)
+
+    # DB time is reported by the query stats middleware as its own "db" entry
+    add_server_timing(response, _server_timing(phases, total))
+    response.headers["X-Profile-Id"] = store_profile(samples)
+    return response
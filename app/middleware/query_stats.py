@@ -0,0 +1,107 @@
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "1") == "1"
+# Raise instead of warn when an endpoint exceeds its @query_budget (set in CI/tests)
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "0") == "1"
+# Same SQL issued this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in enforce mode when an endpoint issues more queries than declared."""
+
+
+class QueryStats:
+    """Statement count and DB time collected for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict:
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or not conn.info.get("query_start"):
+        return
+    stats.record(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+
+def query_budget(max_queries: int):
+    """Declare the maximum number of SQL statements an endpoint may issue."""
+    def decorator(func):
+        func.__query_budget__ = max_queries
+        return func
+    return decorator
+
+
+def add_server_timing(response, entry: str):
+    existing = response.headers.get("Server-Timing")
+    response.headers["Server-Timing"] = f"{existing}, {entry}" if existing else entry
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """
+    Count SQL statements and DB time per request and report them in Server-Timing.
+    """
+    if not QUERY_STATS_ENABLED:
+        return await call_next(request)
+
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    add_server_timing(response, f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"')
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+
+    repeated = stats.repeated()
+    if repeated:
+        response.headers["X-DB-Repeated-Queries"] = str(len(repeated))
+        for sql, n in repeated.items():
+            print(f"⚠️ Possible N+1 on {request.method} {request.url.path}: {n}x {sql}")
+
+    endpoint = request.scope.get("endpoint")
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is not None and stats.count > budget:
+        message = (
+            f"{request.method} {request.url.path} issued {stats.count} queries, "
+            f"budget is {budget}"
+        )
+        if QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(message)
+        print(f"⚠️ Query budget exceeded: {message}")
+
+    return response
@@ -1,5 +1,15 @@
-from sqlalchemy.orm import declarative_base
+# Importing the package registers every table on Base.metadata, which
+# Alembic autogenerate and the schema drift check compare against
+from app.database import Base
 
+from .audit import AuditLog
 from .base_migration import BaseMixin
+from .category import Category, CategoryChangeClock
+from .category_stats import (CategoryStatsByCreator, CategoryStatsByDay,
+                             CategoryStatsTotals)
+from .idempotency import IdempotencyKey
+from .task import BackgroundTask
+from .user import User
 
-Base = declarative_base(cls=BaseMixin)
+__all__ = ['Base', 'BaseMixin', 'User', 'Category', 'CategoryChangeClock', 'BackgroundTask', 'AuditLog', 'IdempotencyKey',
+           'CategoryStatsTotals', 'CategoryStatsByCreator', 'CategoryStatsByDay']
@@ -0,0 +1,24 @@
+from sqlalchemy import (BigInteger, Column, DateTime, Index, Integer, String,
+                        Text)
+
+from app.database import Base
+
+
+class AuditLog(Base):
+    """One captured insert/update/delete of a BaseMixin model."""
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        # History of one row, and everything one user did, newest first
+        Index("ix_audit_log_table_row_id", "table_name", "row_id", "id"),
+        Index("ix_audit_log_actor_id", "actor_id", "id"),
+        Index("ix_audit_log_tenant_id", "tenant_id", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    tenant_id = Column(Integer, nullable=True)  # None for changes made outside a tenant
+    table_name = Column(String(100), nullable=False)
+    row_id = Column(Integer, nullable=True)  # None for set-based updates
+    action = Column(String(10), nullable=False)  # insert | update | delete
+    actor_id = Column(Integer, nullable=True)
+    changes = Column(Text, nullable=True)  # JSON
+    created_at = Column(DateTime(timezone=True), nullable=False)  # when the change was committed
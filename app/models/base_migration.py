@@ -22,3 +22,7 @@ class BaseMixin:
     @declared_attr
     def deleted_by(cls):
         return Column(Integer, nullable=True)
+
+    @declared_attr
+    def deleted_at(cls):
+        return Column(DateTime(timezone=True), nullable=True)
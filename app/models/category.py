@@ -1,4 +1,5 @@
-from sqlalchemy import Column, DateTime, Integer, String, Text, func
+from sqlalchemy import (BigInteger, Column, ForeignKeyConstraint, Index, Integer, String,
+                        UniqueConstraint, null, text)
 
 from app.database import Base
 from app.models.base_migration import BaseMixin
@@ -6,9 +7,47 @@ from app.models.base_migration import BaseMixin
 
 class Category(Base, BaseMixin):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Names are unique per tenant, not globally
+        UniqueConstraint("tenant_id", "name", name="uq_categories_tenant_id_name"),
+        # Target of the parent key, so a parent always belongs to the same tenant
+        UniqueConstraint("tenant_id", "id", name="uq_categories_tenant_id_id"),
+        ForeignKeyConstraint(
+            ["tenant_id", "parent_id"], ["categories.tenant_id", "categories.id"],
+            name="fk_categories_tenant_id_parent_id",
+        ),
+        # Materialized path, e.g. "/1/5/12/": subtrees are prefix scans
+        Index("ix_categories_tenant_id_path", "tenant_id", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+        # Keyset for the change feed (GET /categories/changes)
+        Index("ix_categories_tenant_id_change_seq_id", "tenant_id", "change_seq", "id"),
+        # Rows written by open transactions, stamped at their commit
+        Index(
+            "ix_categories_change_seq_pending", "id",
+            postgresql_where=text("change_seq IS NULL"), sqlite_where=text("change_seq IS NULL"),
+        ),
+        # Covers the default GET /categories projection, so the list is an index-only scan
+        Index(
+            "ix_categories_tenant_id_live", "tenant_id", "id",
+            postgresql_include=["name", "created_by"],
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, nullable=False)
+    tenant_id = Column(Integer, nullable=False, default=0, server_default="0")
+    name = Column(String(100), nullable=False)
     description = Column(String(255), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    parent_id = Column(Integer, nullable=True, index=True)
+    path = Column(String(1024), nullable=True)
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    # Commit order for the change feed; NULL until app.helpers.change_feed
+    # stamps the writing transaction as it commits
+    change_seq = Column(BigInteger, nullable=True, onupdate=null())
+
+
+class CategoryChangeClock(Base):
+    """One row per tenant handing out its change_seq values; see app.helpers.change_feed."""
+    __tablename__ = "category_change_clock"
+
+    tenant_id = Column(Integer, primary_key=True, autoincrement=False)
+    value = Column(BigInteger, nullable=False, default=0)
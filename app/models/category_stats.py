@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Date, DateTime, Index, Integer
+
+from app.database import Base
+
+# Maintained by app.helpers.category_stats; never written by request handlers.
+# created_by 0 stands for categories without a creator.
+
+
+class CategoryStatsTotals(Base):
+    __tablename__ = "category_stats_totals"
+
+    tenant_id = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(Integer, nullable=False, default=0)
+    live = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)  # last full recount
+
+
+class CategoryStatsByCreator(Base):
+    __tablename__ = "category_stats_by_creator"
+    __table_args__ = (
+        # Top creators of a tenant without sorting
+        Index("ix_category_stats_by_creator_tenant_id_live", "tenant_id", "live"),
+    )
+
+    tenant_id = Column(Integer, primary_key=True)
+    created_by = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    live = Column(Integer, nullable=False, default=0)
+
+
+class CategoryStatsByDay(Base):
+    __tablename__ = "category_stats_by_day"
+
+    tenant_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of created_at
+    created = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,23 @@
+from sqlalchemy import (Column, DateTime, Index, Integer, LargeBinary, String,
+                        Text, func)
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """Stored response of a POST sent with an Idempotency-Key (IDEMPOTENCY_BACKEND=database)."""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Expired keys are deleted in bulk
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    key = Column(String(64), primary_key=True)  # sha256 of principal, route and Idempotency-Key
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the request body
+    state = Column(String(20), nullable=False)  # in_flight | done
+    status_code = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)  # JSON object
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Lease end while in flight, replay deadline once done
+    expires_at = Column(DateTime(timezone=True), nullable=False)
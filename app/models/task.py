@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+
+from app.database import Base
+
+
+class BackgroundTask(Base):
+    """Row of the durable task queue (TASK_BACKEND=database)."""
+    __tablename__ = "background_tasks"
+    __table_args__ = (
+        # Workers claim the oldest ready rows of one status
+        Index("ix_background_tasks_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
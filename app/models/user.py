@@ -12,3 +12,4 @@ class User(Base):
     password = Column(String(255), nullable=False)
     full_name = Column(String(100), nullable=True)
     is_active = Column(Integer, default=1)  # 1 = active, 0 = inactive
+    tenant_id = Column(Integer, nullable=False, default=0, server_default="0", index=True)
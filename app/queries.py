@@ -0,0 +1,105 @@
+"""
+Prebuilt statements for the hot lookups.
+
+The SELECTs are constructed once at import time with named bind parameters,
+so a lookup only binds values and hits SQLAlchemy's compiled-SQL cache
+instead of rebuilding the statement on every call. With psycopg 3 the
+engine additionally turns them into server-side prepared statements (see
+DB_PREPARE_THRESHOLD in app.database).
+"""
+import os
+import threading
+
+from sqlalchemy import Integer, any_, bindparam, event, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.user import User
+
+# Set to 0 to build a fresh select() per lookup (e.g. when debugging)
+QUERY_STATEMENT_CACHE = os.getenv("QUERY_STATEMENT_CACHE", "1") == "1"
+
+
+class CompileCacheStats:
+    """Process-wide hit/miss counts of SQLAlchemy's compiled-statement cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+compile_cache_stats = CompileCacheStats()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_cache_hit(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and getattr(context, "compiled", None) is not None:
+        compile_cache_stats.record(context.cache_hit is CACHE_HIT)
+
+
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+CATEGORY_BY_ID = select(Category).where(Category.id == bindparam("category_id"), Category.deleted_at.is_(None))
+CATEGORY_BY_NAME = select(Category).where(Category.name == bindparam("name"))
+# Postgres binds the whole list as one array, so the SQL (and any prepared
+# statement) is the same for every list length; elsewhere IN is expanded
+CATEGORIES_BY_IDS_ANY = select(Category).where(
+    Category.id == any_(bindparam("category_ids", type_=ARRAY(Integer))), Category.deleted_at.is_(None)
+)
+CATEGORIES_BY_IDS_IN = select(Category).where(
+    Category.id.in_(bindparam("category_ids", expanding=True)), Category.deleted_at.is_(None)
+)
+
+
+def get_user_by_id(db: Session, user_id: int):
+    if QUERY_STATEMENT_CACHE:
+        return db.scalars(USER_BY_ID, {"user_id": user_id}).first()
+    return db.scalars(select(User).where(User.id == user_id)).first()
+
+
+def get_category_by_id(db: Session, category_id: int):
+    if QUERY_STATEMENT_CACHE:
+        return db.scalars(CATEGORY_BY_ID, {"category_id": category_id}).first()
+    return db.scalars(select(Category).where(Category.id == category_id, Category.deleted_at.is_(None))).first()
+
+
+def get_category_by_name(db: Session, name: str):
+    if QUERY_STATEMENT_CACHE:
+        return db.scalars(CATEGORY_BY_NAME, {"name": name}).first()
+    return db.scalars(select(Category).where(Category.name == name)).first()
+
+
+def get_categories_by_ids(db: Session, category_ids) -> dict:
+    """Live categories among the ids, keyed by id, in a single query."""
+    category_ids = list(set(category_ids))
+    if not category_ids:
+        return {}
+    stmt = CATEGORIES_BY_IDS_ANY if db.get_bind().dialect.name == "postgresql" else CATEGORIES_BY_IDS_IN
+    return {category.id: category for category in db.scalars(stmt, {"category_ids": category_ids})}
+
+
+def get_categories_by_tenant_ids(db: Session, keys) -> dict:
+    """Live categories among (tenant_id, id) pairs of any tenants, keyed by the pair, in a single query."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    stmt = select(Category).where(tuple_(Category.tenant_id, Category.id).in_(keys), Category.deleted_at.is_(None))
+    return {(category.tenant_id, category.id): category for category in db.scalars(stmt)}
@@ -0,0 +1,114 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.audit import audit_writer
+from app.helpers.category_stats import stats_refresher
+from app.helpers.response import error_response, success_response
+from app.idempotency import idempotency_store
+from app.middleware.admission import limiters
+from app.middleware.profiling import (SamplingProfiler, authorized, profiles,
+                                      store_profile)
+from app.queries import compile_cache_stats
+from app.tasks import task_queue
+
+# Operational counters; off by default, and even then only served with X-Admin-Token
+ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", "0") == "1"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+router = APIRouter(prefix="/_admin", tags=["Admin"])
+# Installed only with PROFILING_ENABLED=1, guarded by X-Profile-Token
+profiling_router = APIRouter(prefix="/_admin", tags=["Profiling"])
+
+
+def admin_authorized(request: Request) -> bool:
+    return bool(ADMIN_TOKEN) and request.headers.get("X-Admin-Token") == ADMIN_TOKEN
+
+
+@profiling_router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    """Folded stacks of a profiled request (flamegraph.pl / speedscope input)."""
+    if not authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Profiling not allowed", code=403))
+
+    folded = profiles.get(profile_id)
+    if folded is None:
+        return JSONResponse(status_code=404, content=error_response(message="Profile not found", code=404))
+    return PlainTextResponse(folded)
+
+
+@profiling_router.post("/profile")
+async def profile_window(
+    request: Request,
+    seconds: float = Query(5, gt=0, le=60, description="How long to sample"),
+    mode: str = Query("wall", pattern="^(wall|cpu)$")
+):
+    """Sample the whole process for a time window and return folded stacks."""
+    if not authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Profiling not allowed", code=403))
+
+    profiler = SamplingProfiler(mode).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        samples = profiler.stop()
+
+    response = PlainTextResponse(SamplingProfiler.folded(samples))
+    response.headers["X-Profile-Id"] = store_profile(samples)
+    return response
+
+
+@router.get("/query-cache")
+async def query_cache_stats(request: Request):
+    """Hit rate of the compiled-statement cache since process start."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data=compile_cache_stats.as_dict())
+
+
+@router.get("/tasks")
+async def task_stats(request: Request):
+    """Background task queue counters and current depth."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data=task_queue.stats())
+
+
+@router.get("/audit")
+async def audit_stats(request: Request):
+    """Audit writer counters and how many records are waiting to be written."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data=audit_writer.stats())
+
+
+@router.get("/admission")
+async def admission_stats(request: Request):
+    """Per route group limit, in-flight and waiting requests, and rejections."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data={name: limiter.stats() for name, limiter in limiters.items()})
+
+
+@router.get("/idempotency")
+async def idempotency_stats(request: Request):
+    """Idempotency-Key claims, replays, waits and cleanup counters."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data=idempotency_store.stats())
+
+
+@router.get("/category-stats")
+async def category_stats_refresh(request: Request):
+    """Scheduled recounts of the category summary tables."""
+    if not admin_authorized(request):
+        return JSONResponse(status_code=403, content=error_response(message="Not allowed", code=403))
+
+    return success_response(data=stats_refresher.stats())
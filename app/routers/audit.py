@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.helpers.response import error_json_response, success_response
+from app.middleware.profiling import ProfiledRoute
+from app.middleware.query_stats import query_budget
+from app.models.audit import AuditLog
+from app.schemas.audit import AuditEntryList, AuditPage
+from app.schemas.response import ApiResponse
+
+router = APIRouter(prefix="/audit", tags=["Audit"], route_class=ProfiledRoute)
+
+
+@router.get("/", response_model=ApiResponse[AuditPage])
+@query_budget(2)
+def get_audit_log(
+    request: Request,
+    db: Session = Depends(get_db),
+    table: str = Query(None, description="Table name, e.g. categories"),
+    row_id: int = Query(None, description="History of one row (needs table)"),
+    actor_id: int = Query(None, description="Changes made by this user"),
+    action: str = Query(None, pattern="^(insert|update|delete)$"),
+    since: datetime = Query(None, description="Only changes committed at or after this time"),
+    before: int = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Audit trail, newest first. Entries appear within AUDIT_FLUSH_SECONDS of the commit."""
+    if not hasattr(request.state, "user"):
+        return error_json_response(message="Authentication required", code=401)
+    if row_id is not None and table is None:
+        return error_json_response(message="row_id requires table", code=400)
+
+    stmt = select(AuditLog)
+    if table is not None:
+        stmt = stmt.where(AuditLog.table_name == table)
+    if row_id is not None:
+        stmt = stmt.where(AuditLog.row_id == row_id)
+    if actor_id is not None:
+        stmt = stmt.where(AuditLog.actor_id == actor_id)
+    if action is not None:
+        stmt = stmt.where(AuditLog.action == action)
+    if since is not None:
+        stmt = stmt.where(AuditLog.created_at >= since)
+    if before is not None:
+        stmt = stmt.where(AuditLog.id < before)
+    rows = list(db.scalars(stmt.order_by(AuditLog.id.desc()).limit(limit + 1)))
+
+    entries = AuditEntryList.validate_python(rows[:limit], from_attributes=True)
+    next_cursor = entries[-1].id if len(rows) > limit else None
+    return success_response(data=AuditPage(entries=entries, next_cursor=next_cursor))
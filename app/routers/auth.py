@@ -10,10 +10,13 @@ from sqlalchemy.orm import Session
 from app.auth.auth import (create_access_token, decode_access_token,
                            get_password_hash, verify_password)
 from app.database import get_db
+from app.middleware.profiling import ProfiledRoute
+from app.middleware.query_stats import query_budget
 from app.models.user import User
-from app.schemas.user import UserCreate, UserOut
+from app.schemas.user import Token, UserCreate, UserOut
+from app.tasks import QueueFull, enqueue
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 class LoginRequest(BaseModel):
@@ -22,6 +25,10 @@ class LoginRequest(BaseModel):
 
 
 @router.post("/register", response_model=UserOut)
+# 3: email check, username check, insert
+# +2 with TASK_BACKEND=database: task insert, periodic depth check
+# +2 with IDEMPOTENCY_BACKEND=database and an Idempotency-Key: claim, store
+@query_budget(7)
 def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
     # Check if user exists by email
@@ -41,45 +48,39 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         password=hashed_password
     )
     db.add(new_user)
+    db.flush()
+    # Read before the commit expires it, so there is no refresh query
+    created = UserOut.model_validate(new_user)
     db.commit()
-    db.refresh(new_user)
-    return new_user
 
+    # Side effects run after the response, on the task queue
+    try:
+        enqueue("users.welcome", user_id=created.id, email=created.email)
+    except QueueFull:
+        print(f"⚠️ Task queue full, skipped welcome email for user {created.id}")
+
+    return created
 
-@router.post("/login")
+
+@router.post("/login", response_model=Token)
+@query_budget(2)
 def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Login user with username/email and password."""
-    print(f"🔐 Login attempt for: {request.username}")
-    
     # Try to find user by email first, then by username
     user = db.query(User).filter(User.email == request.username).first()
-    
+
     # If not found by email, try username (if your User model has a username field)
     if not user and hasattr(User, 'username'):
         user = db.query(User).filter(User.username == request.username).first()
-        print(f"👤 Searching by username: {user is not None}")
-    else:
-        print(f"📧 Found by email: {user is not None}")
-    
+
     if not user:
-        print(f"❌ User not found: {request.username}")
         raise HTTPException(status_code=400, detail="User not found")
-    
-    print(f"🔍 User found: ID={user.id}, Email={user.email}")
-    
-    # Verify password
-    password_valid = verify_password(request.password, user.password)
-    print(f"🔑 Password valid: {password_valid}")
-    
-    if not password_valid:
-        print("❌ Invalid password")
+
+    if not verify_password(request.password, user.password):
         raise HTTPException(status_code=400, detail="Incorrect password")
-    
-    # Create token
-    token_payload = {"user_id": user.id}
-    token = create_access_token(token_payload)
-    print(f"🎫 Token created for user {user.id}")
-    
+
+    token = create_access_token({"user_id": user.id})
+
     return {
         "access_token": token, 
         "token_type": "bearer",
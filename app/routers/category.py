@@ -1,22 +1,43 @@
 
 
 # ---------------- Updated Category Routes ----------------
-from typing import Any, Dict, List
+import os
+import time
+from typing import List, Union
 
+from anyio import from_thread
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.helpers.response import (error_response, paginated_response,
+from app.database import SessionLocal, get_db, read_session
+from app.helpers import category_io, category_stats, category_tree, change_feed
+from app.helpers.batch_loader import BatchLoader
+from app.helpers.response import (error_json_response, paginated_response,
                                   success_response)
+from app.helpers.tenancy import set_tenant, tenant_of, unscoped
+from app.middleware.profiling import ProfiledRoute
+from app.middleware.query_stats import query_budget
 from app.models import category as models
+from app.queries import (get_categories_by_ids, get_categories_by_tenant_ids,
+                         get_category_by_id, get_category_by_name)
 from app.schemas import category as schemas
+from app.schemas.response import ApiResponse
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(prefix="/categories", tags=["Categories"], route_class=ProfiledRoute)
+
+# Window for coalescing concurrent single-id lookups; 0 queries each one directly
+CATEGORY_COALESCE_MS = float(os.getenv("CATEGORY_COALESCE_MS", "2"))
 
 
 # Option 1: Using middleware (current approach)
-@router.post("/")
+@router.post("/", response_model=ApiResponse[schemas.CategoryOut])
+# 5 with a parent: auth, name check, parent, insert, path
+# +3 stats upserts, +2 change feed stamp
+# +2 with IDEMPOTENCY_BACKEND=database and an Idempotency-Key: claim, store
+@query_budget(12)
 def create_category(
     request: Request,
     category: schemas.CategoryCreate,
@@ -26,82 +47,451 @@ def create_category(
     try:
         current_user = request.state.user
     except AttributeError:
-        return error_response(message="Authentication required", code=401)
+        return error_json_response(message="Authentication required", code=401)
 
     # Check if category already exists
-    existing_category = db.query(models.Category).filter(
-        models.Category.name == category.name
-    ).first()
+    existing_category = get_category_by_name(db, category.name)
     
     if existing_category:
-        return error_response(message="Category already exists", code=400)
+        return error_json_response(message="Category already exists", code=400)
+
+    parent = None
+    if category.parent_id is not None:
+        parent = get_category_by_id(db, category.parent_id)
+        if not parent:
+            return error_json_response(message="Parent category not found", code=400)
 
     # Create new category
-    new_category = models.Category(**category.dict())
+    new_category = models.Category(**category.model_dump(exclude={"parent_id"}))
     new_category.created_by = current_user.id
 
     db.add(new_category)
+    category_tree.place(db, new_category, parent)
+    # Everything the response shows is known once flushed; reading it back
+    # after the commit would cost another query
+    created = schemas.CategoryOut.model_validate(new_category)
     db.commit()
-    db.refresh(new_category)
-
-    return success_response(
-        data={
-            "id": new_category.id, 
-            "name": new_category.name, 
-            "created_by": new_category.created_by
-        }
-    )
 
+    return success_response(data=created)
 
 
-@router.get("/")
-async def get_categories(
+
+@router.get("/", response_model=ApiResponse[Union[List[schemas.CategoryOut], schemas.CategoryBatch]])
+@query_budget(2)
+def get_categories(
     request: Request,
     db: Session = Depends(get_db),
-    name: str = Query(None, description="Name to search for")
+    name: str = Query(None, description="Name to search for"),
+    ids: str = Query(None, description="Comma separated ids to fetch in one query, e.g. 1,2,3"),
+    fields: str = Query(None, description="Comma separated fields to return, e.g. id,name,path")
 ):
-    """Get all categories with optional name filter."""
+    """Get all categories with optional name filter, or the given ids."""
     try:
         current_user = request.state.user
     except AttributeError:
-        return error_response(message="Authentication required", code=401)
+        return error_json_response(message="Authentication required", code=401)
+
+    try:
+        selected = schemas.parse_fields(fields)
+    except ValueError as e:
+        return error_json_response(message=str(e), code=400)
+
+    if ids is not None:
+        if fields:
+            return error_json_response(message="fields cannot be combined with ids", code=400)
+        try:
+            batch = schemas.CategoryBatchGet(ids=[int(part) for part in ids.split(",") if part.strip()])
+        except ValueError as e:
+            return error_json_response(message=f"Invalid ids: {e}", code=400)
+        return success_response(data=_batch(batch.ids, get_categories_by_ids(db, batch.ids)))
 
-    query = db.query(models.Category)
+    stmt = _select_fields(selected).order_by(models.Category.id)
     if name:
-        query = query.filter(models.Category.name.ilike(f"%{name}%"))
-    
-    categories = query.all()
+        stmt = stmt.where(models.Category.name.ilike(f"%{name}%"))
+    rows = db.execute(stmt).all()
 
-    if not categories:
+    if not rows:
         return success_response(data=[], message="No categories found")
 
-    categories_data = [
-        {"id": cat.id, "name": cat.name, "created_by": cat.created_by}
-        for cat in categories
-    ]
-    
-    return success_response(data=categories_data)
+    if selected == schemas.DEFAULT_CATEGORY_FIELDS:
+        return success_response(data=schemas.CategoryOutList.validate_python(rows, from_attributes=True))
+    return _sparse_response(rows, selected)
+
+
+def _select_fields(fields) -> Select:
+    # Plain column rows: no entities are built or tracked in the identity map
+    return select(*(getattr(models.Category, field) for field in fields)).where(models.Category.deleted_at.is_(None))
+
+
+def _sparse_response(rows, fields, single: bool = False) -> JSONResponse:
+    # Returned as a Response, the route's response_model only knows the full shapes
+    adapter = schemas.sparse_list_adapter(fields)
+    data = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return JSONResponse(content=success_response(data=data[0] if single else data))
+
+
+def _batch(ids: List[int], found: dict) -> schemas.CategoryBatch:
+    return schemas.CategoryBatch(
+        items=[found.get(category_id) for category_id in ids],
+        missing=[category_id for category_id in dict.fromkeys(ids) if category_id not in found],
+    )
+
+
+@router.post("/batch-get", response_model=ApiResponse[schemas.CategoryBatch])
+@query_budget(2)
+def batch_get_categories(
+    batch: schemas.CategoryBatchGet,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Categories for up to 1000 ids in one query, in request order; missing ids are null."""
+    if not hasattr(request.state, "user"):
+        return error_json_response(message="Authentication required", code=401)
+
+    return success_response(data=_batch(batch.ids, get_categories_by_ids(db, batch.ids)))
+
+
+@router.get("/stats", response_model=ApiResponse[schemas.CategoryStats])
+@query_budget(4)
+def get_category_stats(
+    request: Request,
+    db: Session = Depends(get_db),
+    days: int = Query(30, ge=1, le=366, description="Days of per-day counts, ending today (UTC)"),
+    top: int = Query(100, ge=1, le=1000, description="Creators with the most live categories")
+):
+    """Category counts of the tenant, from the summary tables; see staleness_bound_seconds."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    # Primary only: a lagging replica would report counts the bound does not cover
+    db.info["read_only"] = False
+    return success_response(data=category_stats.read_stats(db, tenant_of(current_user), days=days, top=top))
+
+
+def _load_categories(keys: List[tuple]) -> dict:
+    # Shared by concurrent requests of any tenant, so it uses its own unscoped
+    # session, matches on (tenant_id, id) and returns plain models
+    db = unscoped(read_session())
+    try:
+        found = get_categories_by_tenant_ids(db, keys)
+        return {key: schemas.CategoryOut.model_validate(category) for key, category in found.items()}
+    finally:
+        db.close()
+
+
+# Merges GET /categories/{id} calls that arrive within the window into one query
+category_loader = BatchLoader(_load_categories, window=CATEGORY_COALESCE_MS / 1000)
+
+
+def _read_changes(since, limit: int, tenant_id: int) -> schemas.CategoryChangePage:
+    # Primary only: a lagging replica would show newer stamps before older ones
+    db = set_tenant(SessionLocal(), tenant_id)
+    try:
+        rows, next_token, has_more = change_feed.fetch_changes(db, since, limit)
+        changes = schemas.CategoryChangeList.validate_python(rows, from_attributes=True)
+    finally:
+        db.close()
+    return schemas.CategoryChangePage(changes=changes, next_token=next_token, has_more=has_more)
+
+
+@router.get("/changes", response_model=ApiResponse[schemas.CategoryChangePage])
+async def get_category_changes(
+    request: Request,
+    since: str = Query(None, description="next_token of the previous page; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll up to this many seconds for new changes")
+):
+    """Categories created, updated or deleted after the change token."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    if since:
+        try:
+            change_feed.decode_token(since)
+        except ValueError as e:
+            return error_json_response(message=str(e), code=400)
+
+    deadline = time.monotonic() + wait
+    while True:
+        version = change_feed.change_version()
+        page = await run_in_threadpool(_read_changes, since, limit, tenant_of(current_user))
+        remaining = deadline - time.monotonic()
+        if page.changes or remaining <= 0:
+            return success_response(data=page)
+        await change_feed.wait_for_change(version, min(remaining, change_feed.CHANGE_FEED_POLL_SECONDS))
+
+
+@router.get("/changes/stream")
+async def stream_category_changes(
+    request: Request,
+    since: str = Query(None, description="Change token to resume from (or Last-Event-ID)"),
+    limit: int = Query(500, ge=1, le=5000)
+):
+    """Server-sent events: one "change" event per row, the event id is its change token."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    tenant_id = tenant_of(current_user)
+    since = request.headers.get("Last-Event-ID") or since
+    if since:
+        try:
+            change_feed.decode_token(since)
+        except ValueError as e:
+            return error_json_response(message=str(e), code=400)
+
+    async def events():
+        token = since
+        last_sent = time.monotonic()
+        while True:
+            version = change_feed.change_version()
+            page = await run_in_threadpool(_read_changes, token, limit, tenant_id)
+            for change in page.changes:
+                token = change_feed.encode_token(change.change_seq, change.id)
+                yield f"id: {token}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+                last_sent = time.monotonic()
+            if page.has_more:
+                continue
+            if time.monotonic() - last_sent > 15:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            await change_feed.wait_for_change(version, change_feed.CHANGE_FEED_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/export")
+def export_categories(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    include_deleted: bool = Query(False)
+):
+    """Stream the tenant's categories as CSV, NDJSON or Parquet."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+    if format == "parquet" and category_io.pyarrow is None:
+        return error_json_response(message="Parquet export is not available (pyarrow not installed)", code=400)
+
+    # The session lives as long as the stream, not the request handler
+    db = read_session(tenant_of(current_user))
+    chunks = category_io.export_categories(db, format, include_deleted)
+
+    def stream():
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=category_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="categories.{format}"'},
+    )
+
+
+def _body_chunks(request: Request):
+    """The request body as a blocking iterator, for use on a worker thread."""
+    stream = request.stream().__aiter__()
+    while True:
+        try:
+            yield from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+def _import(request: Request, db: Session, format: str, atomic: bool, user_id: int):
+    job = category_io.CategoryImport(db, user_id=user_id)
+    job.load(category_io.PARSERS[format](category_io.text_lines(_body_chunks(request))))
+    if atomic and job.error_count:
+        db.rollback()
+        return job.result({"inserted": 0, "updated": 0})
+    merged = job.merge()
+    db.commit()
+    return job.result(merged)
 
 
-@router.get("/{category_id}")
+@router.post("/import")
+async def import_categories(
+    request: Request,
+    format: str = Query(None, pattern="^(csv|ndjson)$", description="Defaults from Content-Type"),
+    atomic: bool = Query(False, description="Import nothing if any line is invalid"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk upsert by name from a CSV (header with name, description, parent_id)
+    or NDJSON body. Invalid lines are reported with their line number.
+    """
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    if format is None:
+        content_type = request.headers.get("Content-Type", "")
+        format = "ndjson" if "ndjson" in content_type or "json" in content_type else "csv"
+
+    try:
+        result = await run_in_threadpool(_import, request, db, format, atomic, current_user.id)
+    except category_io.ImportFormatError as e:
+        return error_json_response(message=str(e), code=400)
+
+    message = f"Imported with {result['error_count']} invalid lines" if result["error_count"] else "Success"
+    return success_response(data=result, message=message)
+
+
+@router.get("/{category_id}", response_model=ApiResponse[schemas.CategoryOut])
+@query_budget(2)
 async def get_category(
     category_id: int,
     request: Request,
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+    db: Session = Depends(get_db),
+    fields: str = Query(None, description="Comma separated fields to return, e.g. id,name,path")
+):
     """Get single category by ID."""
     try:
         current_user = request.state.user
     except AttributeError:
-        return error_response(message="Authentication required", code=401)
+        return error_json_response(message="Authentication required", code=401)
 
-    category = db.query(models.Category).filter(
-        models.Category.id == category_id
-    ).first()
+    if fields:
+        try:
+            selected = schemas.parse_fields(fields)
+        except ValueError as e:
+            return error_json_response(message=str(e), code=400)
+        row = db.execute(_select_fields(selected).where(models.Category.id == category_id)).first()
+        if row is None:
+            return error_json_response(message="Category not found", code=404)
+        return _sparse_response([row], selected, single=True)
+
+    if CATEGORY_COALESCE_MS > 0 and db.info.get("read_only"):
+        category = await category_loader.load((tenant_of(current_user), category_id))
+    else:
+        # Recent writers read their own writes from the primary
+        category = get_category_by_id(db, category_id)
     
     if not category:
-        return error_response(message="Category not found", code=404)
+        return error_json_response(message="Category not found", code=404)
+
+    return success_response(data=category)
+
+
+@router.get("/{category_id}/children", response_model=ApiResponse[List[schemas.CategoryNodeOut]])
+@query_budget(3)
+def get_category_children(
+    category_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Direct children of a category."""
+    if not hasattr(request.state, "user"):
+        return error_json_response(message="Authentication required", code=401)
+
+    category = get_category_by_id(db, category_id)
+    if not category:
+        return error_json_response(message="Category not found", code=404)
+
+    nodes = category_tree.children(db, category)
+    return success_response(data=schemas.CategoryNodeOutList.validate_python(nodes, from_attributes=True))
+
+
+@router.get("/{category_id}/subtree", response_model=ApiResponse[List[schemas.CategoryNodeOut]])
+@query_budget(3)
+def get_category_subtree(
+    category_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    max_depth: int = Query(None, ge=0, description="Levels below the category to include"),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """A category and its descendants in depth-first order."""
+    if not hasattr(request.state, "user"):
+        return error_json_response(message="Authentication required", code=401)
+
+    category = get_category_by_id(db, category_id)
+    if not category:
+        return error_json_response(message="Category not found", code=404)
+
+    nodes = category_tree.subtree(db, category, max_depth=max_depth, limit=limit)
+    return success_response(data=schemas.CategoryNodeOutList.validate_python(nodes, from_attributes=True))
+
+
+@router.get("/{category_id}/ancestors", response_model=ApiResponse[List[schemas.CategoryNodeOut]])
+@query_budget(3)
+def get_category_ancestors(
+    category_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Breadcrumb from the root down to the category's parent."""
+    if not hasattr(request.state, "user"):
+        return error_json_response(message="Authentication required", code=401)
+
+    category = get_category_by_id(db, category_id)
+    if not category:
+        return error_json_response(message="Category not found", code=404)
+
+    nodes = category_tree.ancestors(db, category)
+    return success_response(data=schemas.CategoryNodeOutList.validate_python(nodes, from_attributes=True))
+
+
+@router.put("/{category_id}/parent", response_model=ApiResponse[schemas.CategoryNodeOut])
+@query_budget(8)  # includes +2 change feed stamp
+def move_category(
+    category_id: int,
+    move: schemas.CategoryMove,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Move a category, with its whole subtree, under another parent."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    category = get_category_by_id(db, category_id)
+    if not category:
+        return error_json_response(message="Category not found", code=404)
+
+    new_parent = None
+    if move.parent_id is not None:
+        new_parent = get_category_by_id(db, move.parent_id)
+        if not new_parent:
+            return error_json_response(message="Parent category not found", code=400)
+
+    try:
+        category_tree.move(db, category, new_parent, user_id=current_user.id)
+    except category_tree.TreeError as e:
+        return error_json_response(message=str(e), code=400)
+    db.commit()
+
+    return success_response(data=get_category_by_id(db, category_id))
+
+
+@router.delete("/{category_id}", response_model=ApiResponse[schemas.CategoryOut])
+@query_budget(8)  # includes +2 stats upserts, +2 change feed stamp
+def delete_category(
+    category_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Soft-delete a category together with its subtree."""
+    try:
+        current_user = request.state.user
+    except AttributeError:
+        return error_json_response(message="Authentication required", code=401)
+
+    category = get_category_by_id(db, category_id)
+    if not category:
+        return error_json_response(message="Category not found", code=404)
+
+    category_tree.soft_delete(db, category, user_id=current_user.id)
+    db.commit()
 
-    return success_response(
-        data={"id": category.id, "name": category.name, "created_by": category.created_by}
-    )
\ No newline at end of file
+    return success_response(data=category, message="Category deleted")
@@ -0,0 +1,111 @@
+"""
+Compares the ORM models with the schema the database actually has.
+
+    python -m app.schema_check          # exit 1 on drift or pending migrations
+    python -m app.schema_check --init   # create an empty database at head
+
+--init builds a fresh database straight from the models and stamps it with
+the latest revision, so it never replays the migration history.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from app.database import engine
+from app.models import Base
+
+# off | warn | strict: what the app does at startup when the schema drifted
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn")
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+def _describe(diff) -> str:
+    if isinstance(diff, list):
+        # Column modifications come grouped: (op, schema, table, column, info, old, new)
+        return "; ".join(f"{op} {table}.{column}: {old!r} -> {new!r}"
+                         for op, _, table, column, _, old, new in diff)
+    op, *details = diff
+    return f"{op} " + " ".join(
+        getattr(part, "name", None) or str(part) for part in details if part is not None
+    )
+
+
+def schema_problems(bind=engine) -> List[str]:
+    """Pending migrations and differences between Base.metadata and the database."""
+    heads = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    with bind.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        current = set(context.get_current_heads())
+        problems = []
+        if not current:
+            problems.append("database is not under Alembic control (see --init or alembic stamp)")
+        elif current != heads:
+            problems.append(f"database is at {', '.join(sorted(current))}, "
+                            f"code expects {', '.join(sorted(heads))}: run alembic upgrade head")
+        problems.extend(_describe(diff) for diff in compare_metadata(context, Base.metadata))
+    return problems
+
+
+def check_at_startup(bind=engine):
+    """Runs the check according to SCHEMA_CHECK; strict refuses to start."""
+    if SCHEMA_CHECK == "off":
+        return
+    try:
+        problems = schema_problems(bind)
+    except Exception as e:
+        print("⚠️ Schema check failed:", e)
+        return
+    if not problems:
+        return
+    for problem in problems:
+        print(f"⚠️ Schema drift: {problem}")
+    if SCHEMA_CHECK == "strict":
+        raise RuntimeError(f"Database schema does not match the models ({len(problems)} differences)")
+
+
+def init_database(bind=engine):
+    """Create all tables of an empty database and stamp it at head."""
+    existing = inspect(bind).get_table_names()
+    if existing:
+        raise SystemExit(f"Refusing to initialize: database already has tables ({', '.join(existing)})")
+    script = ScriptDirectory.from_config(alembic_config())
+    head = script.get_current_head()
+    with bind.begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        MigrationContext.configure(connection).stamp(script, head)
+    print(f"✅ Created {len(Base.metadata.tables)} tables, stamped at {head}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.schema_check", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--init", action="store_true", help="create the schema of an empty database and stamp it at head")
+    args = parser.parse_args(argv)
+
+    if args.init:
+        init_database()
+        return
+
+    problems = schema_problems()
+    if not problems:
+        print("✅ Database schema matches the models")
+        return
+    for problem in problems:
+        print(f"❌ {problem}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Json, TypeAdapter
+
+
+class AuditEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    table_name: str
+    row_id: Optional[int] = None
+    action: str
+    actor_id: Optional[int] = None
+    changes: Optional[Json[Any]] = None
+    created_at: datetime
+
+
+class AuditPage(BaseModel):
+    entries: List[AuditEntry]
+    next_cursor: Optional[int] = None  # pass as "before" to get older entries
+
+
+AuditEntryList = TypeAdapter(List[AuditEntry])
@@ -1,7 +1,9 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import (BaseModel, ConfigDict, Field, TypeAdapter, computed_field,
+                      create_model)
 
 
 class CategoryBase(BaseModel):
@@ -10,13 +12,124 @@ class CategoryBase(BaseModel):
 
 
 class CategoryCreate(CategoryBase):
-    pass
+    parent_id: Optional[int] = None
+
+
+class CategoryMove(BaseModel):
+    parent_id: Optional[int] = None  # None moves the category to the root
+
+
+class CategoryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    created_by: Optional[int] = None
+
+
+class CategoryNodeOut(CategoryOut):
+    parent_id: Optional[int] = None
+    depth: int
+    path: str
+
+
+class CategoryDetail(CategoryNodeOut):
+    description: Optional[str] = None
+    updated_by: Optional[int] = None
+    deleted_by: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    deleted_at: Optional[datetime] = None
+
+
+class CategoryChange(CategoryDetail):
+    change_seq: int  # commit order; the change token is (change_seq, id)
+
+    @computed_field
+    @property
+    def op(self) -> str:
+        if self.deleted_at is not None:
+            return "deleted"
+        return "created" if self.created_at == self.updated_at else "updated"
+
+
+class CategoryChangePage(BaseModel):
+    changes: List[CategoryChange]
+    next_token: Optional[str] = None
+    has_more: bool
+
+
+class CategoryBatchGet(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+
+
+class CategoryBatch(BaseModel):
+    items: List[Optional[CategoryOut]]  # in request order, null where missing
+    missing: List[int]
+
+
+class CategoryCreatorCount(BaseModel):
+    created_by: Optional[int] = None
+    total: int
+    live: int
+
+
+class CategoryDayCount(BaseModel):
+    day: date  # UTC
+    created: int
+
+
+class CategoryStats(BaseModel):
+    total: int
+    live: int
+    deleted: int
+    by_creator: List[CategoryCreatorCount]  # most live categories first
+    by_day: List[CategoryDayCount]
+    refreshed_at: Optional[datetime] = None  # last full recount
+    staleness_bound_seconds: float
+    maintenance: str  # "incremental" or "scheduled"
 
 
 class CategoryResponse(CategoryBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+
+# Validates a whole list of ORM rows in one call into the Rust core. The
+# route's response_model then takes the resulting models as they are
+# (pydantic does not revalidate instances), so rows are validated once.
+CategoryOutList = TypeAdapter(List[CategoryOut])
+CategoryNodeOutList = TypeAdapter(List[CategoryNodeOut])
+CategoryChangeList = TypeAdapter(List[CategoryChange])
+
+
+# Columns a client can pick with ?fields=, in output order; id is always included
+CATEGORY_FIELDS = tuple(CategoryDetail.model_fields)
+DEFAULT_CATEGORY_FIELDS = tuple(CategoryOut.model_fields)
+
+
+def parse_fields(spec: Optional[str]) -> Tuple[str, ...]:
+    """Normalized field tuple for a "name,path" spec; raises ValueError for unknown fields."""
+    if not spec:
+        return DEFAULT_CATEGORY_FIELDS
+    requested = {part.strip() for part in spec.split(",") if part.strip()}
+    unknown = requested.difference(CATEGORY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}; "
+                         f"available: {', '.join(CATEGORY_FIELDS)}")
+    requested.add("id")
+    return tuple(field for field in CATEGORY_FIELDS if field in requested)
+
+
+@lru_cache(maxsize=256)
+def sparse_list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    """List validator for a model with just these CategoryDetail fields, built once per field set."""
+    model = create_model(
+        "CategorySparse_" + "_".join(fields),
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (CategoryDetail.model_fields[field].annotation, ...) for field in fields},
+    )
+    return TypeAdapter(List[model])
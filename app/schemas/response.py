@@ -0,0 +1,23 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Pagination(BaseModel):
+    current_page: int
+    per_page: int
+    total_items: int
+    total_pages: int
+    has_next: bool
+    has_prev: bool
+
+
+class ApiResponse(BaseModel, Generic[T]):
+    """Typed form of the envelope built by app.helpers.response."""
+    result: bool
+    code: int
+    message: str
+    data: T
+    pagination: Optional[Pagination] = None
@@ -0,0 +1,5 @@
+# Background task queue: handlers enqueue work and return immediately
+from .backends import DatabaseBackend, MemoryBackend, QueueFull
+from .queue import TaskQueue, enqueue, task, task_queue
+
+__all__ = ['task', 'enqueue', 'task_queue', 'TaskQueue', 'QueueFull', 'MemoryBackend', 'DatabaseBackend']
@@ -0,0 +1,224 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+
+from app.database import SessionLocal
+from app.models.task import BackgroundTask
+
+
+class QueueFull(Exception):
+    """Raised by enqueue when the backend already holds its maximum of pending tasks."""
+
+
+class Job:
+    """One enqueued call of a registered task."""
+
+    __slots__ = ("id", "name", "payload", "attempts", "run_at", "enqueued_at")
+
+    def __init__(self, name: str, payload: dict, attempts: int = 0, run_at: float = 0.0, id=None):
+        self.id = id
+        self.name = name
+        self.payload = payload
+        self.attempts = attempts
+        self.run_at = run_at
+        self.enqueued_at = time.time()
+
+
+class MemoryBackend:
+    """
+    Bounded in-process queue, kept per task name so similar tasks can be
+    claimed together as one batch. Pending tasks are lost if the process dies.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._ready: Dict[str, list] = {}
+        self._delayed = []  # heap of (run_at, seq, job) waiting for a retry
+        self._size = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, job: Job):
+        with self._cond:
+            if self.maxsize and self._size >= self.maxsize:
+                raise QueueFull(f"Task queue is full ({self.maxsize} pending)")
+            self._size += 1
+            self._ready.setdefault(job.name, []).append(job)
+            self._cond.notify()
+
+    def _promote_delayed(self, now: float):
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job = heapq.heappop(self._delayed)
+            self._ready.setdefault(job.name, []).append(job)
+
+    def claim(self, batch_sizes: Dict[str, int], timeout: float) -> List[Job]:
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                self._promote_delayed(now)
+                for name in list(self._ready):
+                    jobs = self._ready[name]
+                    if not jobs:
+                        continue
+                    size = batch_sizes.get(name, 1)
+                    batch, self._ready[name] = jobs[:size], jobs[size:]
+                    # Rotate so one busy task name cannot starve the others
+                    self._ready[name] = self._ready.pop(name)
+                    return batch
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return []
+                if self._delayed:
+                    remaining = min(remaining, self._delayed[0][0] - now)
+                self._cond.wait(max(remaining, 0.001))
+
+    def complete(self, jobs: List[Job]):
+        with self._cond:
+            self._size -= len(jobs)
+
+    def retry(self, job: Job, delay: float, error: str):
+        job.run_at = time.time() + delay
+        with self._cond:
+            heapq.heappush(self._delayed, (job.run_at, next(self._seq), job))
+            self._cond.notify()
+
+    def fail(self, job: Job, error: str):
+        with self._cond:
+            self._size -= 1
+
+    def depth(self) -> int:
+        return self._size
+
+
+class DatabaseBackend:
+    """
+    Durable queue in the background_tasks table.
+
+    A claimed row is leased for lease_seconds; if its worker dies the lease
+    runs out and another worker picks it up again. On Postgres claims use
+    FOR UPDATE SKIP LOCKED so workers never block each other.
+    """
+
+    def __init__(self, maxsize: int = 100000, poll_seconds: float = 0.5, lease_seconds: float = 300):
+        self.maxsize = maxsize
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._depth = 0
+        self._depth_checked = 0.0
+
+    def _approximate_depth(self, db) -> int:
+        # Counting on every put would double the cost of enqueueing
+        if time.monotonic() - self._depth_checked > 1:
+            self._depth = self._pending(db)
+            self._depth_checked = time.monotonic()
+        return self._depth
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def put(self, job: Job):
+        db = SessionLocal()
+        try:
+            if self.maxsize and self._approximate_depth(db) >= self.maxsize:
+                raise QueueFull(f"Task queue is full ({self.maxsize} pending)")
+            row = BackgroundTask(name=job.name, payload=json.dumps(job.payload), status="pending",
+                                 attempts=job.attempts, run_at=self._now())
+            db.add(row)
+            db.flush()
+            job.id = row.id
+            db.commit()
+            self._depth += 1
+        finally:
+            db.close()
+
+    def _claim_once(self, batch_sizes: Dict[str, int]) -> List[Job]:
+        db = SessionLocal()
+        try:
+            now = self._now()
+            ready = or_(
+                (BackgroundTask.status == "pending") & (BackgroundTask.run_at <= now),
+                # Lease of a crashed worker ran out
+                (BackgroundTask.status == "running") & (BackgroundTask.run_at <= now),
+            )
+            first = db.scalars(
+                select(BackgroundTask).where(ready).order_by(BackgroundTask.run_at, BackgroundTask.id)
+                .limit(1).with_for_update(skip_locked=True)
+            ).first()
+            if first is None:
+                db.rollback()
+                return []
+
+            rows = list(db.scalars(
+                select(BackgroundTask).where(ready, BackgroundTask.name == first.name)
+                .order_by(BackgroundTask.run_at, BackgroundTask.id)
+                .limit(batch_sizes.get(first.name, 1)).with_for_update(skip_locked=True)
+            )) or [first]
+            # Re-checking "ready" makes the claim atomic where SKIP LOCKED is unavailable
+            lease = now + timedelta(seconds=self.lease_seconds)
+            claimed = set(db.scalars(
+                update(BackgroundTask).where(BackgroundTask.id.in_([row.id for row in rows]), ready)
+                .values(status="running", run_at=lease)
+                .returning(BackgroundTask.id)
+                .execution_options(synchronize_session=False)
+            ))
+            jobs = [
+                Job(row.name, json.loads(row.payload), attempts=row.attempts, id=row.id)
+                for row in rows if row.id in claimed
+            ]
+            db.commit()
+            return jobs
+        finally:
+            db.close()
+
+    def claim(self, batch_sizes: Dict[str, int], timeout: float) -> List[Job]:
+        deadline = time.time() + timeout
+        while True:
+            jobs = self._claim_once(batch_sizes)
+            if jobs or time.time() >= deadline:
+                return jobs
+            time.sleep(min(self.poll_seconds, max(deadline - time.time(), 0)))
+
+    def _finish(self, statement):
+        db = SessionLocal()
+        try:
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+    def complete(self, jobs: List[Job]):
+        self._finish(delete(BackgroundTask).where(BackgroundTask.id.in_([job.id for job in jobs])))
+
+    def retry(self, job: Job, delay: float, error: str):
+        self._finish(
+            update(BackgroundTask).where(BackgroundTask.id == job.id)
+            .values(status="pending", attempts=job.attempts, last_error=error,
+                    run_at=self._now() + timedelta(seconds=delay))
+        )
+
+    def fail(self, job: Job, error: str):
+        # Kept for inspection; failed rows are never claimed again
+        self._finish(
+            update(BackgroundTask).where(BackgroundTask.id == job.id)
+            .values(status="failed", attempts=job.attempts, last_error=error)
+        )
+
+    @staticmethod
+    def _pending(db) -> int:
+        return db.scalar(select(func.count()).select_from(BackgroundTask).where(BackgroundTask.status != "failed"))
+
+    def depth(self) -> Optional[int]:
+        db = SessionLocal()
+        try:
+            return self._pending(db)
+        finally:
+            db.close()
@@ -0,0 +1,10 @@
+from typing import List
+
+from app.tasks import task
+
+
+@task("users.welcome", max_retries=5, batch_size=50)
+def send_welcome_emails(payloads: List[dict]):
+    """Welcome new users; batched so a signup burst is one round of work."""
+    for payload in payloads:
+        print(f"📧 Welcome email for user {payload['user_id']} <{payload['email']}>")
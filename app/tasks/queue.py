@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List
+
+from app.tasks.backends import DatabaseBackend, Job, MemoryBackend, QueueFull
+
+TASK_BACKEND = os.getenv("TASK_BACKEND", "memory")  # memory | database
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))
+TASK_QUEUE_SIZE = int(os.getenv("TASK_QUEUE_SIZE", "10000"))
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "0.5"))
+TASK_MAX_BACKOFF = float(os.getenv("TASK_MAX_BACKOFF", "300"))
+
+
+class TaskSpec:
+    def __init__(self, name: str, func: Callable, max_retries: int, backoff: float, batch_size: int):
+        self.name = name
+        self.func = func
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+
+
+class TaskQueue:
+    """
+    Runs registered tasks on a pool of worker threads.
+
+    Failed tasks are retried with exponential backoff up to max_retries; tasks
+    registered with batch_size > 1 receive a list of payloads so similar work
+    is handled in one go.
+    """
+
+    def __init__(self, backend, workers: int = TASK_WORKERS):
+        self.backend = backend
+        self.workers = workers
+        self.tasks: Dict[str, TaskSpec] = {}
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.metrics = {
+            "enqueued": 0, "rejected": 0, "succeeded": 0, "retried": 0, "failed": 0,
+            "batches": 0, "wait_seconds": 0.0, "run_seconds": 0.0,
+        }
+
+    def _count(self, key: str, amount=1):
+        with self._lock:
+            self.metrics[key] += amount
+
+    def task(self, name: str = None, max_retries: int = 3, backoff: float = 1.0, batch_size: int = 1):
+        """Register a function as a task."""
+        def decorator(func):
+            task_name = name or f"{func.__module__}.{func.__name__}"
+            self.tasks[task_name] = TaskSpec(task_name, func, max_retries, backoff, batch_size)
+            func.task_name = task_name
+            return func
+        return decorator
+
+    def enqueue(self, name: str, **payload):
+        """Queue a task; raises QueueFull when the backend is at capacity."""
+        if name not in self.tasks:
+            raise KeyError(f"Unknown task: {name}")
+        try:
+            self.backend.put(Job(name, payload))
+        except QueueFull:
+            self._count("rejected")
+            raise
+        self._count("enqueued")
+
+    def start(self):
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 30):
+        """Stop claiming new work once the queue is drained or the timeout passes."""
+        deadline = time.monotonic() + timeout
+        # Only in-memory work needs draining; durable tasks wait in the table
+        if isinstance(self.backend, MemoryBackend):
+            while self.backend.depth() and time.monotonic() < deadline and self._threads:
+                time.sleep(0.05)
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0.1))
+        self._threads = []
+
+    def _work(self):
+        batch_sizes = {name: spec.batch_size for name, spec in self.tasks.items()}
+        while not self._stopping.is_set():
+            try:
+                jobs = self.backend.claim(batch_sizes, timeout=TASK_POLL_SECONDS)
+            except Exception as e:
+                print(f"❌ Task backend error: {e}")
+                time.sleep(TASK_POLL_SECONDS)
+                continue
+            if jobs:
+                self._run(jobs)
+
+    def _run(self, jobs: List[Job]):
+        spec = self.tasks.get(jobs[0].name)
+        start = time.time()
+        self._count("wait_seconds", sum(start - job.enqueued_at for job in jobs))
+        self._count("batches")
+        try:
+            if spec is None:
+                raise KeyError(f"Unknown task: {jobs[0].name}")
+            if spec.batch_size > 1:
+                spec.func([job.payload for job in jobs])
+            else:
+                for job in jobs:
+                    spec.func(**job.payload)
+        except Exception:
+            error = traceback.format_exc(limit=5)
+            for job in jobs:
+                job.attempts += 1
+                if spec is not None and job.attempts <= spec.max_retries:
+                    delay = min(spec.backoff * 2 ** (job.attempts - 1), TASK_MAX_BACKOFF)
+                    self.backend.retry(job, delay, error)
+                    self._count("retried")
+                else:
+                    print(f"❌ Task {job.name} failed after {job.attempts} attempts: {error.splitlines()[-1]}")
+                    self.backend.fail(job, error)
+                    self._count("failed")
+        else:
+            self.backend.complete(jobs)
+            self._count("succeeded", len(jobs))
+        finally:
+            self._count("run_seconds", time.time() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.metrics)
+        stats["backend"] = type(self.backend).__name__
+        stats["depth"] = self.backend.depth()
+        stats["workers"] = len(self._threads)
+        return stats
+
+
+def _backend_from_env():
+    if TASK_BACKEND == "database":
+        return DatabaseBackend(maxsize=TASK_QUEUE_SIZE, poll_seconds=TASK_POLL_SECONDS)
+    return MemoryBackend(maxsize=TASK_QUEUE_SIZE)
+
+
+task_queue = TaskQueue(_backend_from_env())
+task = task_queue.task
+enqueue = task_queue.enqueue
@@ -0,0 +1,111 @@
+"""
+Bulk category export and import: wall time and peak Python memory.
+
+    python -m benchmarks.bench_category_io [rows] [--memory]
+
+--memory also reports peak Python allocations, which slows everything down
+several times, so compare timings only between runs without it.
+
+Uses DATABASE_URL if set (Postgres exercises COPY), otherwise a temporary
+SQLite file.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/io.db"
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.helpers import category_io  # noqa: E402
+from app.helpers.tenancy import DEFAULT_TENANT_ID, set_tenant  # noqa: E402
+from app.models.category import Category  # noqa: E402
+
+
+def build(rows: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for start in range(1, rows + 1, 10000):
+            connection.execute(insert(Category), [
+                {"id": i, "name": f"cat{i}", "description": f"description of {i}", "path": f"/{i}/", "depth": 0}
+                for i in range(start, min(start + 10000, rows + 1))
+            ])
+
+
+TRACE_MEMORY = "--memory" in sys.argv
+
+
+def measured(label: str, func):
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    start = time.perf_counter()
+    detail = func()
+    elapsed = time.perf_counter() - start
+    if TRACE_MEMORY:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        detail += f", peak {peak / 2**20:.1f} MiB"
+    print(f"{label:<28} {elapsed:8.2f} s  {detail}")
+
+
+def export(format: str, path: str):
+    def run():
+        db = set_tenant(SessionLocal(), DEFAULT_TENANT_ID)
+        size = 0
+        try:
+            with open(path, "wb") as out:
+                for chunk in category_io.export_categories(db, format):
+                    out.write(chunk)
+                    size += len(chunk)
+        finally:
+            db.close()
+        return f"{size / 2**20:.1f} MiB written"
+    return run
+
+
+def import_file(format: str, path: str):
+    def chunks():
+        with open(path, "rb") as source:
+            while chunk := source.read(64 * 1024):
+                yield chunk
+
+    def run():
+        db = set_tenant(SessionLocal(), DEFAULT_TENANT_ID)
+        try:
+            job = category_io.CategoryImport(db)
+            job.load(category_io.PARSERS[format](category_io.text_lines(chunks())))
+            result = job.result(job.merge())
+            db.commit()
+        finally:
+            db.close()
+        return f"{result['inserted']} inserted, {result['updated']} updated, {result['error_count']} errors"
+    return run
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 200000
+    build(rows)
+    workdir = tempfile.mkdtemp()
+    csv_path, ndjson_path = os.path.join(workdir, "c.csv"), os.path.join(workdir, "c.ndjson")
+
+    measured(f"export csv ({rows} rows)", export("csv", csv_path))
+    measured(f"export ndjson ({rows} rows)", export("ndjson", ndjson_path))
+    if category_io.pyarrow is not None:
+        measured(f"export parquet ({rows} rows)", export("parquet", os.path.join(workdir, "c.parquet")))
+
+    measured("import csv (all updates)", import_file("csv", csv_path))
+    with engine.begin() as connection:
+        connection.execute(delete(Category))
+    measured("import ndjson (all inserts)", import_file("ndjson", ndjson_path))
+    with engine.connect() as connection:
+        print("rows after import:", connection.scalar(select(func.count()).select_from(Category)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Category tree queries at depth 10 with 100k nodes: materialized path vs
+walking parent_id from Python.
+
+    python -m benchmarks.bench_category_tree [nodes] [depth]
+
+Uses DATABASE_URL if set, otherwise a temporary SQLite file.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tree.db"
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.helpers import category_tree  # noqa: E402
+from app.helpers.tenancy import DEFAULT_TENANT_ID, set_tenant  # noqa: E402
+from app.models.category import Category  # noqa: E402
+
+
+def build(nodes: int, max_depth: int):
+    """Random tree where every level down to max_depth is populated."""
+    random.seed(42)
+    rows = []
+    by_depth = {d: [] for d in range(max_depth + 1)}
+    for i in range(1, nodes + 1):
+        # Seed a single chain first so depth max_depth is guaranteed
+        depth = i - 1 if i <= max_depth + 1 else random.randint(0, max_depth)
+        parent = rows[i - 2] if i <= max_depth + 1 and i > 1 else (
+            random.choice(by_depth[depth - 1]) if depth > 0 else None
+        )
+        path = f"{parent['path'] if parent else '/'}{i}/"
+        row = {"id": i, "name": f"node{i}", "parent_id": parent["id"] if parent else None, "path": path, "depth": depth}
+        rows.append(row)
+        by_depth[depth].append(row)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for start in range(0, len(rows), 10000):
+            connection.execute(insert(Category), rows[start:start + 10000])
+    return by_depth
+
+
+def naive_ancestors(db, category):
+    chain = []
+    while category.parent_id is not None:
+        category = db.get(Category, category.parent_id)
+        chain.append(category)
+    return chain
+
+
+def naive_subtree(db, category):
+    found, frontier = [category], [category.id]
+    while frontier:
+        level = list(db.scalars(select(Category).where(Category.parent_id.in_(frontier))))
+        found.extend(level)
+        frontier = [c.id for c in level]
+    return found
+
+
+def timed(label, func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        db = set_tenant(SessionLocal(), DEFAULT_TENANT_ID)
+        start = time.perf_counter()
+        result = func(db)
+        best = min(best, time.perf_counter() - start)
+        db.rollback()
+        db.close()
+    print(f"{label:<44} {best * 1000:9.2f} ms  ({result} rows)")
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    start = time.perf_counter()
+    by_depth = build(nodes, max_depth)
+    print(f"built {nodes} nodes, depth {max_depth} in {time.perf_counter() - start:.1f}s")
+
+    deepest = by_depth[max_depth][0]["id"]
+    branch = by_depth[1][0]["id"]
+    mid = by_depth[5][0]["id"]
+    target = by_depth[2][-1]["id"]
+
+    def load(db, category_id):
+        return db.get(Category, category_id)
+
+    timed("ancestors of depth-10 node (path)", lambda db: len(category_tree.ancestors(db, load(db, deepest))))
+    timed("ancestors of depth-10 node (parent_id walk)", lambda db: len(naive_ancestors(db, load(db, deepest))))
+    timed("subtree of depth-1 node (path)", lambda db: len(category_tree.subtree(db, load(db, branch))))
+    timed("subtree of depth-1 node (parent_id walk)", lambda db: len(naive_subtree(db, load(db, branch))))
+    timed("children of depth-1 node", lambda db: len(category_tree.children(db, load(db, branch))))
+    timed("move depth-5 subtree under depth-2 node", lambda db: category_tree.move(db, load(db, mid), load(db, target)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-lookup CPU cost of the hot lookups: ORM Query vs per-call select() vs prebuilt statements.
+
+    python -m benchmarks.bench_lookups [iterations]
+
+Runs against DATABASE_URL (defaults to an in-memory SQLite database) so the
+numbers are dominated by Python-side statement construction and compilation.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import queries  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.helpers.tenancy import DEFAULT_TENANT_ID, set_tenant  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def legacy_user(db, user_id):
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def legacy_category(db, category_id):
+    return db.query(Category).filter(Category.id == category_id).first()
+
+
+def legacy_category_name(db, name):
+    return db.query(Category).filter(Category.name == name).first()
+
+
+def run(label, lookup, args, iterations):
+    db = set_tenant(SessionLocal(), DEFAULT_TENANT_ID)
+    try:
+        start = time.process_time()
+        for i in range(iterations):
+            lookup(db, args[i % len(args)])
+        elapsed = time.process_time() - start
+    finally:
+        db.close()
+    print(f"{label:<32} {elapsed / iterations * 1e6:8.1f} µs/lookup")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    Base.metadata.create_all(bind=engine)
+    db = set_tenant(SessionLocal(), DEFAULT_TENANT_ID)
+    db.add_all([User(username=f"user{i}", email=f"user{i}@example.com", password="x") for i in range(100)])
+    db.add_all([Category(name=f"category{i}") for i in range(100)])
+    db.commit()
+    db.close()
+
+    ids = list(range(1, 101))
+    names = [f"category{i}" for i in range(100)]
+
+    for statement_cache in (False, True):
+        queries.QUERY_STATEMENT_CACHE = statement_cache
+        suffix = "prebuilt" if statement_cache else "select"
+        run(f"user by id ({suffix})", queries.get_user_by_id, ids, iterations)
+        run(f"category by id ({suffix})", queries.get_category_by_id, ids, iterations)
+        run(f"category by name ({suffix})", queries.get_category_by_name, names, iterations)
+
+    run("user by id (Query)", legacy_user, ids, iterations)
+    run("category by id (Query)", legacy_category, ids, iterations)
+    run("category by name (Query)", legacy_category_name, names, iterations)
+
+    print(f"compile cache: {queries.compile_cache_stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
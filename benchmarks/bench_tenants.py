@@ -0,0 +1,107 @@
+"""
+Tenant-scoped category queries with 1000 tenants sharing one table.
+
+    python -m benchmarks.bench_tenants [tenants] [categories_per_tenant]
+
+Every tenant gets a small tree (10 roots, the rest one or two levels
+below). Each operation runs against a random tenant through a session
+scoped with app.helpers.tenancy, the way a request does, and reports
+p50/p99 latency; the tenant's share of the table is what should matter,
+not the table size. Uses DATABASE_URL if set, otherwise a temporary
+SQLite file.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tenants.db"
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.helpers import category_tree  # noqa: E402
+from app.helpers.tenancy import set_tenant  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.queries import get_category_by_name  # noqa: E402
+
+
+def build(tenants: int, per_tenant: int):
+    random.seed(42)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    next_id = 1
+    roots = {}
+    with engine.begin() as connection:
+        for tenant_id in range(1, tenants + 1):
+            rows = []
+            for i in range(per_tenant):
+                parent = None
+                if i >= 10:
+                    parent = random.choice(rows)
+                    if parent["depth"] >= 2:
+                        parent = rows[random.randrange(10)]
+                rows.append({
+                    "id": next_id, "tenant_id": tenant_id, "name": f"cat{i}",
+                    "parent_id": parent["id"] if parent else None,
+                    "path": f"{parent['path'] if parent else '/'}{next_id}/",
+                    "depth": parent["depth"] + 1 if parent else 0,
+                })
+                next_id += 1
+            connection.execute(insert(Category), rows)
+            roots[tenant_id] = [row["id"] for row in rows[:10]]
+    return roots
+
+
+def timed(label, func, tenants: int, repeat: int = 300):
+    samples = []
+    for _ in range(repeat):
+        tenant_id = random.randint(1, tenants)
+        db = set_tenant(SessionLocal(), tenant_id)
+        start = time.perf_counter()
+        rows = func(db, tenant_id)
+        samples.append(time.perf_counter() - start)
+        db.rollback()
+        db.close()
+    samples.sort()
+    p50 = statistics.median(samples) * 1000
+    p99 = samples[int(len(samples) * 0.99) - 1] * 1000
+    print(f"{label:<36} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  ({rows} rows)")
+
+
+def main():
+    tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    per_tenant = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    start = time.perf_counter()
+    roots = build(tenants, per_tenant)
+    print(f"built {tenants} tenants x {per_tenant} categories in {time.perf_counter() - start:.1f}s")
+
+    def list_all(db, tenant_id):
+        return len(list(db.scalars(select(Category).where(Category.deleted_at.is_(None)))))
+
+    def by_name(db, tenant_id):
+        return int(get_category_by_name(db, f"cat{random.randrange(per_tenant)}") is not None)
+
+    def subtree(db, tenant_id):
+        root = db.get(Category, random.choice(roots[tenant_id]))
+        return len(category_tree.subtree(db, root))
+
+    def create(db, tenant_id):
+        category = Category(name=f"new{random.getrandbits(48)}")
+        db.add(category)
+        category_tree.place(db, category, db.get(Category, roots[tenant_id][0]))
+        db.commit()
+        return 1
+
+    timed("list a tenant's categories", list_all, tenants)
+    timed("lookup by name", by_name, tenants)
+    timed("subtree of a root", subtree, tenants)
+    timed("create under a root (commit)", create, tenants)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Throughput of `python -m app` as the worker count goes from 1 to N.
+
+    python -m benchmarks.bench_workers [--max-workers N] [--path /openapi.json] [--seconds 10]
+
+Starts the launcher once per worker count and hammers one path from a pool
+of client threads. Point --path at a CPU-heavy endpoint (and pass
+--header "Authorization: Bearer ...") to see per-core scaling; the client
+itself needs spare cores, so run it on a bigger box or a separate host.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+
+def wait_until_up(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not come up at {url}")
+
+
+def hammer(url: str, headers: dict, seconds: float, clients: int) -> int:
+    done = [0] * clients
+    stop_at = time.monotonic() + seconds
+
+    def client(index: int):
+        request = urllib.request.Request(url, headers=headers)
+        while time.monotonic() < stop_at:
+            try:
+                urllib.request.urlopen(request, timeout=10).read()
+                done[index] += 1
+            except OSError:
+                pass
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/openapi.json")
+    parser.add_argument("--header", action="append", default=[])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    headers = dict(h.split(": ", 1) for h in args.header)
+    url = f"http://127.0.0.1:{args.port}{args.path}"
+
+    counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < args.max_workers], args.max_workers})
+    baseline = None
+    for workers in counts:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app", "--workers", str(workers), "--port", str(args.port), "--max-requests", "0"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(url)
+            requests = hammer(url, headers, args.seconds, args.clients)
+        finally:
+            server.terminate()
+            server.wait()
+
+        rps = requests / args.seconds
+        baseline = baseline or rps
+        print(f"{workers:>3} workers: {rps:9.1f} req/s  ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
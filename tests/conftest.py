@@ -0,0 +1,69 @@
+"""
+Runs the app against a throwaway SQLite database with query budgets
+enforced, and with the database backends of the task queue and the
+idempotency store, so their statements count towards each budget too.
+"""
+import os
+import tempfile
+import uuid
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["QUERY_BUDGET_ENFORCE"] = "1"
+os.environ["TASK_BACKEND"] = "database"
+os.environ["IDEMPOTENCY_BACKEND"] = "database"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.auth.auth import create_access_token  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schema_check import init_database  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    init_database()
+    with TestClient(app) as client:
+        yield client
+
+
+def _create_user(tenant_id=None):
+    db = SessionLocal()
+    try:
+        name = uuid.uuid4().hex[:12]
+        tenant_id = uuid.uuid4().int % 10**6 if tenant_id is None else tenant_id
+        user = User(username=name, email=f"{name}@example.com", password="x", tenant_id=tenant_id)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}
+
+
+@pytest.fixture
+def user(client):
+    return _create_user()
+
+
+@pytest.fixture
+def headers(user):
+    return _headers(user)
+
+
+@pytest.fixture
+def other_user(client, user):
+    """A user of another tenant."""
+    return _create_user(tenant_id=user.tenant_id + 1)
+
+
+@pytest.fixture
+def other_headers(other_user):
+    return _headers(other_user)
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.helpers.batch_loader import BatchLoader
+from app.middleware.deadline import Deadline, current_deadline, use_deadline
+
+
+def run_batch(*deadlines, cancel_first=False):
+    """Load one key per deadline into a single batch; returns (values, deadline seen by the batch)."""
+    seen = []
+
+    def batch_fn(keys):
+        seen.append(current_deadline())
+        return {key: key * 10 for key in keys}
+
+    async def main():
+        loader = BatchLoader(batch_fn)
+        loads = []
+        for key, deadline in enumerate(deadlines):
+            with use_deadline(deadline):
+                loads.append(asyncio.ensure_future(loader.load(key)))
+        await asyncio.sleep(0)
+        if cancel_first:
+            deadlines[0].cancel()
+        return await asyncio.gather(*loads)
+
+    values = asyncio.run(main())
+    assert len(seen) == 1
+    return values, seen[0]
+
+
+def test_opening_request_disconnect_does_not_cancel_the_batch():
+    values, seen = run_batch(Deadline(3000), Deadline(3000), cancel_first=True)
+    assert values == [0, 10]
+    assert seen is not None and not seen.cancelled
+
+
+def test_batch_runs_under_the_longest_caller_deadline():
+    short, long = Deadline(1000), Deadline(5000)
+    _, seen = run_batch(short, long)
+    assert seen not in (short, long)
+    assert 4000 < seen.remaining_ms() <= 5000
+
+
+def test_batch_with_an_unbounded_caller_is_unbounded():
+    _, seen = run_batch(Deadline(1000), None)
+    assert seen is None
@@ -0,0 +1,33 @@
+import uuid
+
+from app.database import engine
+from app.helpers.category_stats import recount_tenant
+from app.routers.category import create_category
+
+
+def stats(client, headers):
+    response = client.get("/categories/stats", headers=headers)
+    assert response.json()["code"] == 200, response.text
+    return response.json()["data"]
+
+
+def test_create_with_parent_and_key_counts_once(client, headers, user):
+    parent = client.post("/categories/", json={"name": uuid.uuid4().hex[:12]}, headers=headers).json()["data"]
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    body = {"name": uuid.uuid4().hex[:12], "parent_id": parent["id"]}
+    for _ in range(2):
+        response = client.post("/categories/", json=body, headers={**headers, **key})
+        assert int(response.headers["X-DB-Query-Count"]) <= create_category.__query_budget__
+    client.delete(f"/categories/{parent['id']}", headers=headers)
+
+    counted = stats(client, headers)
+    assert (counted["total"], counted["live"], counted["deleted"]) == (2, 0, 2)
+    assert counted["staleness_bound_seconds"] == 0.0
+    assert "as_of" not in counted
+
+    with engine.begin() as connection:
+        recount_tenant(connection, user.tenant_id)
+    recounted = stats(client, headers)
+    assert recounted["refreshed_at"] is not None
+    assert {k: recounted[k] for k in ("total", "live", "by_creator", "by_day")} == \
+        {k: counted[k] for k in ("total", "live", "by_creator", "by_day")}
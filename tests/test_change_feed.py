@@ -0,0 +1,53 @@
+import uuid
+
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.helpers.tenancy import unscoped
+from app.models.category import Category, CategoryChangeClock
+
+
+def create(client, headers):
+    response = client.post("/categories/", json={"name": uuid.uuid4().hex[:12]}, headers=headers)
+    return response.json()["data"]["id"]
+
+
+def changes(client, headers, since=None):
+    url = "/categories/changes" + (f"?since={since}" if since else "")
+    return client.get(url, headers=headers).json()["data"]
+
+
+def test_each_tenant_has_its_own_clock(client, headers, other_headers, user, other_user):
+    first = create(client, headers)
+    other = create(client, other_headers)
+    second = create(client, headers)
+
+    page = changes(client, headers)
+    assert [(c["id"], c["change_seq"]) for c in page["changes"]] == [(first, 1), (second, 2)]
+    assert [(c["id"], c["change_seq"]) for c in changes(client, other_headers)["changes"]] == [(other, 1)]
+
+    db = unscoped(SessionLocal())
+    try:
+        clocks = dict(db.execute(select(CategoryChangeClock.tenant_id, CategoryChangeClock.value).where(
+            CategoryChangeClock.tenant_id.in_([user.tenant_id, other_user.tenant_id]))).all())
+        assert clocks == {user.tenant_id: 2, other_user.tenant_id: 1}
+        assert db.scalars(select(Category.id).where(Category.change_seq.is_(None))).all() == []
+    finally:
+        db.close()
+
+    client.delete(f"/categories/{first}", headers=headers)
+    resumed = changes(client, headers, since=page["next_token"])
+    assert [(c["id"], c["change_seq"]) for c in resumed["changes"]] == [(first, 3)]
+
+
+def test_unscoped_bulk_write_stamps_every_tenant_it_touched(client, headers, other_headers, user, other_user):
+    mine, theirs = create(client, headers), create(client, other_headers)
+    db = unscoped(SessionLocal())
+    try:
+        db.execute(update(Category).where(Category.id.in_([mine, theirs])).values(description="bulk"))
+        db.commit()
+    finally:
+        db.close()
+
+    assert [(c["id"], c["change_seq"]) for c in changes(client, headers)["changes"]] == [(mine, 2)]
+    assert [(c["id"], c["change_seq"]) for c in changes(client, other_headers)["changes"]] == [(theirs, 2)]
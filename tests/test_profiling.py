@@ -0,0 +1,40 @@
+import contextvars
+import threading
+import time
+
+from app.middleware.profiling import SamplingProfiler, _phases, _timed_endpoint
+
+
+def _other_request(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _this_request():
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_request_profile_only_samples_its_own_threads():
+    stop = threading.Event()
+    other = threading.Thread(target=_other_request, args=(stop,))
+    other.start()
+    phases = {"threads": set()}
+    token = _phases.set(phases)
+    profiler = SamplingProfiler("wall", interval=0.002, threads=phases["threads"]).start()
+    try:
+        # Like the threadpool, the worker runs the handler in the request's context
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(_timed_endpoint(_this_request),))
+        worker.start()
+        worker.join()
+    finally:
+        samples = profiler.stop()
+        _phases.reset(token)
+        stop.set()
+        other.join()
+
+    stacks = SamplingProfiler.folded(samples)
+    assert "_this_request" in stacks
+    assert "_other_request" not in stacks
+    assert phases["threads"] == set()
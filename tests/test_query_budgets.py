@@ -0,0 +1,78 @@
+"""
+Every budgeted endpoint on its most expensive path. With
+QUERY_BUDGET_ENFORCE=1 a request over its @query_budget raises
+QueryBudgetExceeded, which TestClient re-raises here.
+"""
+import uuid
+
+from app.middleware import query_stats
+from app.routers.category import create_category
+
+
+def test_budgets_are_enforced():
+    assert query_stats.QUERY_BUDGET_ENFORCE
+
+
+def create(client, headers, name=None, **body):
+    response = client.post("/categories/", json={"name": name or uuid.uuid4().hex[:12], **body}, headers=headers)
+    assert response.json()["code"] == 200, response.text
+    return response.json()["data"]
+
+
+def test_create_with_parent_and_idempotency_key(client, headers):
+    parent = create(client, headers)
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    body = {"name": "child", "parent_id": parent["id"]}
+    first = client.post("/categories/", json=body, headers={**headers, **key})
+    assert first.json()["code"] == 200
+    # The most expensive create; its budget has no slack
+    assert int(first.headers["X-DB-Query-Count"]) == create_category.__query_budget__
+    retry = client.post("/categories/", json=body, headers={**headers, **key})
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+def test_list_and_get(client, headers):
+    category = create(client, headers)
+    assert client.get("/categories/", headers=headers).json()["code"] == 200
+    assert client.get("/categories/?fields=id,name,path", headers=headers).json()["code"] == 200
+    assert client.get(f"/categories/?ids={category['id']},0", headers=headers).json()["code"] == 200
+    assert client.get(f"/categories/{category['id']}", headers=headers).json()["data"]["id"] == category["id"]
+    batch = client.post("/categories/batch-get", json={"ids": [category["id"], 0]}, headers=headers)
+    assert batch.json()["data"]["missing"] == [0]
+
+
+def test_tree_reads_and_move(client, headers):
+    root = create(client, headers)
+    child = create(client, headers, parent_id=root["id"])
+    for path in ("children", "subtree", "ancestors"):
+        assert client.get(f"/categories/{child['id']}/{path}", headers=headers).json()["code"] == 200
+    moved = client.put(f"/categories/{child['id']}/parent", json={"parent_id": None}, headers=headers)
+    assert moved.json()["data"]["depth"] == 0
+
+
+def test_delete(client, headers):
+    root = create(client, headers)
+    create(client, headers, parent_id=root["id"])
+    assert client.delete(f"/categories/{root['id']}", headers=headers).json()["code"] == 200
+
+
+def test_stats(client, headers):
+    create(client, headers)
+    assert client.get("/categories/stats", headers=headers).json()["data"]["total"] == 1
+
+
+def test_audit(client, headers):
+    create(client, headers)
+    assert client.get("/audit/", headers=headers).json()["code"] == 200
+
+
+def test_register_and_login_with_idempotency_key(client):
+    name = uuid.uuid4().hex[:12]
+    body = {"username": name, "email": f"{name}@example.com", "password": "secret123"}
+    key = {"Idempotency-Key": uuid.uuid4().hex}
+    registered = client.post("/register", json=body, headers=key)
+    assert registered.status_code == 200, registered.text
+    assert client.post("/register", json=body, headers=key).headers["Idempotent-Replayed"] == "true"
+    login = client.post("/login", json={"username": name, "password": "secret123"})
+    assert login.status_code == 200, login.text
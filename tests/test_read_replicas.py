@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from app import database
+from app.database import ReplicaSet, SessionLocal, engine, read_session
+from app.models.category import Category
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    read_engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    monkeypatch.setattr(database, "replicas", ReplicaSet([read_engine]))
+    yield read_engine
+    read_engine.dispose()
+
+
+def test_reads_go_to_a_replica(replica):
+    db = read_session()
+    try:
+        assert db.get_bind(clause=select(Category)) is replica
+    finally:
+        db.close()
+
+
+def test_session_sticks_to_the_primary_after_a_write(replica):
+    db = read_session()
+    try:
+        assert db.get_bind(clause=select(Category)) is replica
+        assert db.get_bind(clause=text("UPDATE categories SET name = name WHERE 0")) is engine
+        assert db.get_bind(clause=select(Category)) is engine
+    finally:
+        db.close()
+
+
+def test_writable_sessions_and_unhealthy_replicas_use_the_primary(replica):
+    db = SessionLocal()
+    try:
+        assert db.get_bind(clause=select(Category)) is engine
+    finally:
+        db.close()
+
+    database.replicas.mark_down(replica)
+    db = read_session()
+    try:
+        assert db.get_bind(clause=select(Category)) is engine
+    finally:
+        db.close()
+
+
+def test_recent_writers_are_pruned(monkeypatch):
+    monkeypatch.setattr(database, "DB_READ_STICKY_SECONDS", 0.05)
+    monkeypatch.setattr(database, "_recent_writers", {})
+    for principal_id in range(100):
+        database._remember_writer(principal_id)
+    assert database._wrote_recently(99)
+    time.sleep(0.1)
+    database._remember_writer(100)
+    assert list(database._recent_writers) == [100]
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from app.tasks import MemoryBackend, QueueFull, TaskQueue
+from app.tasks.backends import Job
+from app.tasks.queue import TASK_MAX_BACKOFF
+
+
+class RecordingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.retries, self.failures, self.completed = [], [], []
+
+    def retry(self, job, delay, error):
+        self.retries.append((job.attempts, delay))
+
+    def fail(self, job, error):
+        self.failures.append(job.attempts)
+
+    def complete(self, jobs):
+        self.completed.extend(jobs)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_enqueue_raises_queue_full_at_capacity():
+    queue = TaskQueue(MemoryBackend(maxsize=2), workers=0)
+    queue.task("noop")(lambda: None)
+    queue.enqueue("noop")
+    queue.enqueue("noop")
+    with pytest.raises(QueueFull):
+        queue.enqueue("noop")
+    assert (queue.metrics["enqueued"], queue.metrics["rejected"]) == (2, 1)
+    assert queue.backend.depth() == 2
+
+
+def test_unknown_task_is_rejected():
+    with pytest.raises(KeyError):
+        TaskQueue(MemoryBackend(), workers=0).enqueue("missing")
+
+
+def test_failures_back_off_exponentially_then_fail():
+    backend = RecordingBackend()
+    queue = TaskQueue(backend, workers=0)
+
+    @queue.task("flaky", max_retries=3, backoff=2.0)
+    def flaky():
+        raise RuntimeError("boom")
+
+    job = Job("flaky", {})
+    for _ in range(4):
+        queue._run([job])
+    assert backend.retries == [(1, 2.0), (2, 4.0), (3, 8.0)]
+    assert backend.failures == [4]
+    assert (queue.metrics["retried"], queue.metrics["failed"]) == (3, 1)
+
+
+def test_backoff_is_capped():
+    backend = RecordingBackend()
+    queue = TaskQueue(backend, workers=0)
+    queue.task("slow", max_retries=1, backoff=TASK_MAX_BACKOFF)(lambda: 1 / 0)
+    queue._run([Job("slow", {})])
+    assert backend.retries == [(1, TASK_MAX_BACKOFF)]
+
+
+def test_retried_task_runs_again_after_its_delay():
+    queue = TaskQueue(MemoryBackend(), workers=1)
+    calls = []
+
+    @queue.task("eventually", max_retries=2, backoff=0.05)
+    def eventually(n):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise RuntimeError("not yet")
+
+    queue.start()
+    try:
+        queue.enqueue("eventually", n=1)
+        wait_for(lambda: queue.metrics["succeeded"] == 1)
+    finally:
+        queue.stop(timeout=1)
+    assert queue.metrics["retried"] == 2
+    assert calls[1] - calls[0] >= 0.05 and calls[2] - calls[1] >= 0.1
+    assert queue.backend.depth() == 0
+
+
+def test_similar_tasks_run_as_one_batch():
+    queue = TaskQueue(MemoryBackend(), workers=1)
+    batches = []
+    release = threading.Event()
+
+    @queue.task("blocker")
+    def blocker():
+        release.wait(5)
+
+    @queue.task("batched", batch_size=3)
+    def batched(payloads):
+        batches.append([payload["n"] for payload in payloads])
+
+    queue.start()
+    try:
+        # Hold the only worker so the batch builds up behind it
+        queue.enqueue("blocker")
+        wait_for(lambda: queue.metrics["batches"] == 1)
+        for n in range(5):
+            queue.enqueue("batched", n=n)
+        release.set()
+        wait_for(lambda: queue.metrics["succeeded"] == 6)
+    finally:
+        queue.stop(timeout=1)
+    assert batches == [[0, 1, 2], [3, 4]]
@@ -0,0 +1,99 @@
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+
+from app.audit.writer import audit_writer
+from app.database import SessionLocal
+from app.helpers.tenancy import TenantScopeError, set_tenant, unscoped
+from app.models.category import Category
+from app.models.task import BackgroundTask
+from app.models.user import User
+
+
+def create(client, headers, **body):
+    response = client.post("/categories/", json={"name": uuid.uuid4().hex[:12], **body}, headers=headers)
+    return response.json()["data"]
+
+
+@pytest.fixture
+def theirs(client, other_headers):
+    """A root and a child owned by the other tenant."""
+    root = create(client, other_headers)
+    return root, create(client, other_headers, parent_id=root["id"])
+
+
+def test_reads_do_not_cross_tenants(client, headers, theirs):
+    root, child = theirs
+    for path in (f"/categories/{child['id']}", f"/categories/{child['id']}/children",
+                 f"/categories/{child['id']}/subtree", f"/categories/{child['id']}/ancestors"):
+        assert client.get(path, headers=headers).json()["code"] == 404, path
+
+    ids = {c["id"] for c in client.get("/categories/", headers=headers).json()["data"]}
+    assert not ids & {root["id"], child["id"]}
+    batch = client.post("/categories/batch-get", json={"ids": [root["id"], child["id"]]}, headers=headers)
+    assert batch.json()["data"]["missing"] == [root["id"], child["id"]]
+
+    exported = client.get("/categories/export?format=ndjson", headers=headers).text
+    assert root["name"] not in exported and child["name"] not in exported
+
+
+def test_writes_do_not_cross_tenants(client, headers, other_headers, theirs):
+    root, child = theirs
+    mine = create(client, headers)
+
+    assert client.put(f"/categories/{child['id']}/parent", json={"parent_id": None},
+                      headers=headers).json()["code"] == 404
+    assert client.put(f"/categories/{mine['id']}/parent", json={"parent_id": root["id"]},
+                      headers=headers).json()["code"] != 200
+    assert client.delete(f"/categories/{root['id']}", headers=headers).json()["code"] == 404
+
+    # Untouched for their owner
+    assert client.get(f"/categories/{child['id']}/ancestors", headers=other_headers).json()["data"][0]["id"] == root["id"]
+
+
+def test_change_feed_and_audit_do_not_cross_tenants(client, headers, theirs):
+    root, child = theirs
+    mine = create(client, headers)
+    changes = client.get("/categories/changes", headers=headers).json()["data"]["changes"]
+    assert [c["id"] for c in changes] == [mine["id"]]
+
+    audit_writer.flush()
+    entries = client.get("/audit/?table=categories", headers=headers).json()["data"]["entries"]
+    assert [e["row_id"] for e in entries] == [mine["id"]]
+
+
+def test_sessions_without_a_tenant_cannot_touch_tenant_data(client, theirs):
+    root, _ = theirs
+    db = SessionLocal()
+    try:
+        with pytest.raises(TenantScopeError):
+            db.scalars(select(Category)).all()
+        with pytest.raises(TenantScopeError):
+            db.execute(update(Category).values(description="x"))
+        db.rollback()
+        db.add(Category(name=uuid.uuid4().hex[:12]))
+        with pytest.raises(TenantScopeError):
+            db.flush()
+        db.rollback()
+
+        # Auth lookups and the task queue only use models without a tenant
+        db.scalars(select(User).limit(1)).all()
+        db.scalars(select(BackgroundTask).limit(1)).all()
+    finally:
+        db.close()
+
+
+def test_unscoped_and_tenant_sessions(client, other_user, theirs):
+    root, child = theirs
+    db = unscoped(SessionLocal())
+    try:
+        assert db.get(Category, root["id"]) is not None
+    finally:
+        db.close()
+
+    db = set_tenant(SessionLocal(), other_user.tenant_id + 1)
+    try:
+        assert db.scalars(select(Category).where(Category.id.in_([root["id"], child["id"]]))).all() == []
+    finally:
+        db.close()